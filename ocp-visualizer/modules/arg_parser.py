@@ -3,6 +3,8 @@ Module for command line argument parsing.
 """
 
 import argparse
+from datetime import datetime
+from modules.config import DEFAULT_STORE_PATH, RENDER_CACHE_DIR, NODE_INDEX_PATH
 
 def parse_args():
     """Parses command-line arguments."""
@@ -13,16 +15,85 @@ def parse_args():
     group.add_argument("-v", "--verbose", action="store_const", const="verbose", dest="verbosity",
                       help="Set logging level to INFO (verbose)")
     
-    parser.add_argument("-f", "--file", type=str, help="Input file path")
+    parser.add_argument("-f", "--file", dest="files", action="extend", nargs="+", metavar="FILE",
+                        help="Input cluster list (crosstab) file(s) or glob pattern(s); clusters in "
+                             "several files are merged, keeping the newest 'Last Seen'")
+    parser.add_argument("--input-dir", action="append", metavar="DIR",
+                        help="Additional directory to search for <cluster_id>.csv node exports (repeatable)")
     parser.add_argument("--generate-images", action="store_true", help="Generate reference images and display node counts")
     #parser.add_argument("--image-input", type=str, help="Input image path for reference image generation (default: eval.png)")
     #parser.add_argument("--image-output", type=str, help="Output path for generated reference image (default: reference.png)")
     parser.add_argument("--html", action="store_true", help="Generate HTML report")
+    parser.add_argument("--compact-nodes", action="store_true",
+                        help="In HTML reports, show numbered host names as ranges and collapse large node groups")
+    parser.add_argument("--bundle", action="store_true",
+                        help="Write each account's reports, images and assets as a single zip archive")
+    parser.add_argument("--render-cache", nargs="?", const=RENDER_CACHE_DIR, default=None, metavar="DIR",
+                        help=f"Reuse reference tiles rendered by earlier runs, stored in DIR (default: {RENDER_CACHE_DIR})")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and re-render clusters as new exports land in the input folder")
+    parser.add_argument("--watch-interval", type=float, default=0.25,
+                        help="Seconds between input folder polls in watch mode (default: 0.25)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Serve reports from a local HTTP server, rendering each cluster on demand")
+    parser.add_argument("--port", type=int, default=8000, help="Port for --serve (default: 8000)")
+    parser.add_argument("--cache-size", type=int, default=64,
+                        help="Maximum size in MB of rendered pages and tiles kept by --serve (default: 64)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip clusters completed by a previous interrupted run and retry failed ones")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_PATH, default=None,
+                        help=f"Record this run's exports in the snapshot store (default: {DEFAULT_STORE_PATH})")
+    parser.add_argument("--snapshot-date", type=str, metavar="DATE",
+                        help="Date the exports recorded by --store (YYYY-MM-DD[ HH:MM:SS]); by default the "
+                             "newest 'Last Seen' in the crosstabs dates the whole run")
+    parser.add_argument("--trend-cluster", type=str, metavar="CLUSTER_ID",
+                        help="Print the version and node count history of a cluster from the snapshot store")
+    parser.add_argument("--trend-account", type=str, metavar="ACCOUNT",
+                        help="Print node and vCPU totals over time for an account name or EBS account")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD_CSV", "NEW_CSV"),
+                        help="Compare two node exports of the same cluster (add --html for a delta report)")
+    parser.add_argument("--upgrade-edges", type=str, metavar="GRAPH",
+                        help="Update graph (CSV with from,to[,channel] columns or update service JSON); "
+                             "prints each cluster's upgrade path (add --html for lifecycle reports)")
+    parser.add_argument("--upgrade-target", type=str, metavar="VERSION",
+                        help="Target version for --upgrade-edges (default: Desired Version, else newest in graph)")
+    parser.add_argument("--upgrade-channel", type=str, metavar="CHANNEL",
+                        help="Only use CSV edges from this channel (e.g. stable-4.18)")
+    parser.add_argument("--benchmark-ingest", nargs="+", metavar="CSV",
+                        help="Measure UTF-16 decode throughput (MB/s) of the bulk reader against the text I/O path")
+    parser.add_argument("--sql", type=str, metavar="QUERY",
+                        help="Run a read-only SQL query against the snapshot store")
+    parser.add_argument("--build-node-index", action="store_true",
+                        help="Index the nodes of every cluster in the cluster lists, re-reading only changed exports")
+    parser.add_argument("--node-index", type=str, default=NODE_INDEX_PATH, metavar="PATH",
+                        help=f"Node index database (default: {NODE_INDEX_PATH})")
+    parser.add_argument("--find-host", type=str, metavar="HOST_NAME",
+                        help="Print the cluster a host belongs to from the node index ('*' matches any text)")
+    parser.add_argument("--find-spec", nargs=2, type=float, metavar=("CPU", "MEMORY_GB"),
+                        help="Print the nodes with this CPU count and memory from the node index")
+    parser.add_argument("--find-role", type=str, metavar="ROLE",
+                        help="Print the clusters with nodes of this role, or limit --find-spec to it")
 
     args = parser.parse_args()
     
     # Validate arguments
-    if not args.generate_images and not args.file:
+    args.store_query = bool(args.trend_cluster or args.trend_account or args.sql)
+    args.node_query = bool(args.find_host or args.find_spec or args.find_role)
+    if not args.generate_images and not args.files and not args.store_query and not args.diff \
+            and not args.benchmark_ingest and not args.node_query:
         parser.error("the following arguments are required: -f/--file")
+    if args.watch and not args.files:
+        parser.error("--watch requires -f/--file")
+    if args.upgrade_edges and not args.files:
+        parser.error("--upgrade-edges requires -f/--file")
+    if args.serve and not args.files:
+        parser.error("--serve requires -f/--file")
+    if args.snapshot_date:
+        try:
+            datetime.fromisoformat(args.snapshot_date)
+        except ValueError:
+            parser.error(f"--snapshot-date must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS, not {args.snapshot_date!r}")
+    if args.build_node_index and not args.files:
+        parser.error("--build-node-index requires -f/--file")
     
     return args 
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Registry of output backends.
+
+Each backend lives in its own module and is only imported the first time it
+is used, so a run never pays the import cost (Pillow, Airium) of an output
+it does not produce.
+"""
+
+import importlib
+
+# Backend name -> (module, function)
+BACKENDS = {
+    'html': ('modules.html_generator', 'generate_html_report'),
+    'html_diff': ('modules.html_generator', 'generate_html_diff_report'),
+    'lifecycle_html': ('modules.html_generator', 'generate_html_lifecycle_report'),
+    'png': ('modules.layout', 'generate_reference_image'),
+}
+
+_loaded = {}
+
+def register_backend(name, module, function):
+    """Registers (or replaces) a backend by module and function name."""
+    BACKENDS[name] = (module, function)
+    _loaded.pop(name, None)
+
+def get_backend(name):
+    """Returns the callable for a backend, importing its module on first use."""
+    if name not in _loaded:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown output backend: {name}")
+        module_name, function_name = BACKENDS[name]
+        _loaded[name] = getattr(importlib.import_module(module_name), function_name)
+    return _loaded[name]
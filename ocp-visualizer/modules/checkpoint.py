@@ -0,0 +1,117 @@
+"""
+Module for the checkpoint journal used to resume interrupted batch runs.
+
+The journal is an append-only JSON Lines file. The first line describes the
+run (crosstabs and output options); every following line records one cluster
+that completed or failed. Each record is flushed and fsynced as a single
+write, so after a crash the journal holds every finished cluster and at most
+one truncated trailing line, which is ignored on load.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+from modules.config import JOURNAL_DIR
+
+def journal_path_for(crosstab_files):
+    """Returns the journal path used for a given set of crosstab files."""
+    paths = '\n'.join(sorted(os.path.abspath(path) for path in crosstab_files))
+    key = hashlib.sha1(paths.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(JOURNAL_DIR, f"{key}.jsonl")
+
+def run_key(crosstab_files, options):
+    """Identifies a run by each crosstab's path, size and mtime plus the output options."""
+    crosstabs = []
+    for path in sorted(os.path.abspath(path) for path in crosstab_files):
+        stat = os.stat(path)
+        crosstabs.append({'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+    return {'crosstabs': crosstabs, 'options': options}
+
+class CheckpointJournal:
+    """Records completed and failed clusters so a run can be resumed."""
+
+    def __init__(self, crosstab_files, options, resume=False, journal_path=None):
+        """Open the journal for a run, loading previous progress if resuming."""
+        self.logger = logging.getLogger(__name__)
+        self.path = journal_path or journal_path_for(crosstab_files)
+        self.key = run_key(crosstab_files, options)
+        self.completed = {}
+        self.failed = {}
+
+        if resume:
+            self._load()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        if resume and (self.completed or self.failed):
+            self.file = open(self.path, 'a', encoding='utf-8')
+        else:
+            # Start a fresh journal for this run
+            self.completed = {}
+            self.failed = {}
+            self.file = open(self.path, 'w', encoding='utf-8')
+            self._append({'run': self.key, 'started': datetime.now().isoformat(timespec='seconds')})
+
+    def _load(self):
+        """Reads progress from an existing journal that matches this run."""
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            self.logger.info("No checkpoint journal found, starting from the beginning")
+            return
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Truncated final record from an interrupted write
+                self.logger.debug(f"Ignoring incomplete journal line: {line!r}")
+
+        if not records or records[0].get('run') != self.key:
+            self.logger.warning("Checkpoint journal is for a different run, starting from the beginning")
+            return
+
+        for record in records[1:]:
+            cluster_id = record.get('cluster_id')
+            if record.get('status') == 'done':
+                self.completed[cluster_id] = record.get('artifacts', [])
+                self.failed.pop(cluster_id, None)
+            elif record.get('status') == 'failed':
+                self.failed[cluster_id] = record.get('error', '')
+
+        self.logger.info(f"Resuming: {len(self.completed)} clusters already done, "
+                         f"{len(self.failed)} to retry")
+
+    def _append(self, record):
+        """Appends one record durably."""
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def is_done(self, cluster_id):
+        """Returns True if the cluster completed in this or a previous attempt."""
+        return cluster_id in self.completed
+
+    def mark_done(self, cluster_id, artifacts):
+        """Records a cluster as completed along with the files it produced."""
+        self.completed[cluster_id] = artifacts
+        self.failed.pop(cluster_id, None)
+        self._append({'cluster_id': cluster_id, 'status': 'done', 'artifacts': artifacts})
+
+    def mark_failed(self, cluster_id, error):
+        """Quarantines a failed cluster so the run can carry on."""
+        self.failed[cluster_id] = str(error)
+        self._append({'cluster_id': cluster_id, 'status': 'failed', 'error': str(error)})
+
+    def close(self):
+        """Closes the journal, removing it once every cluster has completed."""
+        self.file.close()
+        if not self.failed:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -5,6 +5,9 @@ Configuration settings for the reference image generator.
 
 import os
 
+# Import time allowed before main() starts work, see ocp-visualizer.py
+STARTUP_BUDGET_MS = 100
+
 # DPI settings
 BASE_DPI = 300
 
@@ -14,6 +17,25 @@ FONTS_DIR = os.path.join(REFERENCE_DIR, 'fonts')
 IMAGES_DIR = os.path.join(REFERENCE_DIR, 'images')
 CSS_DIR = os.path.join(REFERENCE_DIR, 'css')
 
+# Historical snapshot store
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.ocp-visualizer', 'history.db')
+
+# Checkpoint journals for resumable runs
+JOURNAL_DIR = os.path.join(os.path.expanduser('~'), '.ocp-visualizer', 'journals')
+
+# Fleet-wide node index
+NODE_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.ocp-visualizer', 'node-index.db')
+
+# Shared cache of rendered reference tiles
+RENDER_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.ocp-visualizer', 'render-cache')
+RENDER_CACHE_MAX_MB = 256
+
+# Clusters rendered between writes of their output files
+OUTPUT_BATCH_SIZE = 25
+
+# Size, mtime and hash of every report file written, to skip unchanged rewrites
+OUTPUT_DIGESTS_PATH = os.path.join(os.path.expanduser('~'), '.ocp-visualizer', 'output-digests.json')
+
 # Image dimensions
 IMAGE_WIDTH_MM = 100
 IMAGE_HEIGHT_MM = 100
@@ -2,59 +2,61 @@
 Module for processing cluster data and files.
 """
 
-import csv
+import ast
 import os
+import glob
 import logging
 from datetime import datetime
+from functools import lru_cache
 from collections import defaultdict
 
+from modules.tsv_reader import read_rows, rows_to_dicts
+
 def read_cluster_csv_file(file_path):
     """Reads and processes the cluster CSV file."""
     clusters = {}
     try:
-        with open(file_path, newline='', encoding='utf-16') as csvfile:
-            reader = csv.reader(csvfile, delimiter='\t')  # Assuming tab-separated values
-            
-            # Skip header rows
-            next(reader)  # Skip the first line (garbage)
-            headers = next(reader)  # Read actual headers
+        rows = read_rows(file_path)  # UTF-16, tab-separated values
+        if len(rows) < 2:
+            raise ValueError("missing header rows")
+
+        # Skip header rows
+        headers = rows[1]  # Read actual headers; the first line is garbage
+
+        # Process the data with named field access
+        for row in rows_to_dicts(rows[2:], headers):
+            if not row or not row["Cluster Id"]:  # Skip empty rows
+                continue
+                
+            cluster_id = row["Cluster Id"]
+            clusters[cluster_id] = {
+                "EBS Account": row["EBS Account"],
+                "Account": row["Account"],
+                "Version": row["Version"],
+                "EOL": row["EOL"] == "True",
+                "Support": row["Support"],
+                "Platform": row["Platform"],
+                "Network Type": row["Network Type"],
+                "Install Type": row["Install Type"],
+                "Managed Product": row["Managed Product"],
+                "Update Risk": row["Update Risk"],
+                "CI": row["ci"] == "True",
+                "Initial Version": row["Initial Version"],
+                "Last Seen": row["Last Seen"],
+                "Associates": row["Associates"] if row["Associates"] else None,
+                "Desired Version": row["Desired Version"],
+                "Install Date": row["Install Date"]
+            }
             
-            # Convert to DictReader for named field access
-            reader = csv.DictReader(csvfile, fieldnames=headers, delimiter='\t')
+            # Check for 'Variant' key
+            if "Variant" not in row:
+                logging.error(f"Missing 'Variant' key for cluster ID {cluster_id}. Setting to '?' by default.")
+                clusters[cluster_id]["Variant"] = "?"
+            else:
+                clusters[cluster_id]["Variant"] = row["Variant"]
             
-            # Process the data
-            for row in reader:
-                if not row or not row["Cluster Id"]:  # Skip empty rows
-                    continue
-                    
-                cluster_id = row["Cluster Id"]
-                clusters[cluster_id] = {
-                    "EBS Account": row["EBS Account"],
-                    "Account": row["Account"],
-                    "Version": row["Version"],
-                    "EOL": row["EOL"] == "True",
-                    "Support": row["Support"],
-                    "Platform": row["Platform"],
-                    "Network Type": row["Network Type"],
-                    "Install Type": row["Install Type"],
-                    "Managed Product": row["Managed Product"],
-                    "Update Risk": row["Update Risk"],
-                    "CI": row["ci"] == "True",
-                    "Initial Version": row["Initial Version"],
-                    "Last Seen": row["Last Seen"],
-                    "Associates": row["Associates"] if row["Associates"] else None,
-                    "Desired Version": row["Desired Version"],
-                    "Install Date": row["Install Date"]
-                }
-                
-                # Check for 'Variant' key
-                if "Variant" not in row:
-                    logging.error(f"Missing 'Variant' key for cluster ID {cluster_id}. Setting to '?' by default.")
-                    clusters[cluster_id]["Variant"] = "?"
-                else:
-                    clusters[cluster_id]["Variant"] = row["Variant"]
-                
-        logging.debug(f"CSV Data: {clusters}")
+        # Lazy formatting: repr of a large crosstab is expensive when debug is off
+        logging.debug("CSV Data: %s", clusters)
         return clusters
     
     except FileNotFoundError:
@@ -64,6 +66,69 @@ def read_cluster_csv_file(file_path):
 
     return None  # Return None if there was an error
 
+def expand_input_files(patterns):
+    """Expands file paths and glob patterns into a de-duplicated list of files."""
+    files = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(os.path.expanduser(pattern))) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            logging.error(f"No files match: {pattern}")
+        for path in matches:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                files.append(path)
+    return files
+
+def merge_cluster_data(cluster_sets):
+    """Merges several read_cluster_csv_file results by Cluster Id.
+
+    When a cluster appears in more than one export, the row with the newest
+    'Last Seen' wins ('YYYY-MM-DD HH:MM:SS' sorts chronologically as text).
+    """
+    merged = {}
+    for clusters in cluster_sets:
+        for cluster_id, cluster_info in clusters.items():
+            current = merged.get(cluster_id)
+            if current is None or (cluster_info.get("Last Seen") or "") > (current.get("Last Seen") or ""):
+                merged[cluster_id] = cluster_info
+    return merged
+
+def build_directory_index(directories):
+    """Indexes the CSV files in one or more directories with a single scan each.
+
+    Returns {file name: path}. If the same file name exists in several
+    directories, the most recently modified copy is used. Only those
+    duplicates are stat'ed; the scan itself makes no per-file calls.
+    """
+    candidates = defaultdict(list)
+    for directory in directories:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.csv') and entry.is_file():
+                        candidates[entry.name].append(entry)
+        except FileNotFoundError:
+            logging.error(f"Input directory not found: {directory}")
+
+    index = {}
+    for name, entries in candidates.items():
+        if len(entries) == 1:
+            index[name] = entries[0].path
+        else:
+            index[name] = max(entries, key=lambda entry: entry.stat().st_mtime_ns).path
+    return index
+
+def resolve_cluster_csv(cluster_id, index, default_dir):
+    """Returns the node export path for a cluster from a directory index.
+
+    Falls back to default_dir when the index has no entry, so callers get a
+    path to report even when the file is missing.
+    """
+    name = f"{cluster_id}.csv"
+    return index.get(name, os.path.join(default_dir, name))
+
 def get_file_creation_date(cluster_file):
     """Gets the creation date of the cluster file."""
     try:
@@ -73,22 +138,42 @@ def get_file_creation_date(cluster_file):
         logging.error(f"Error getting file creation date: {e}")
         return "Unknown"
 
+@lru_cache(maxsize=256)
+def parse_roles(roles):
+    """Converts a Roles cell like '["control-plane", "master"]' to space-separated roles.
+
+    Clusters have only a handful of distinct role lists, so results are cached.
+    """
+    try:
+        return ' '.join(ast.literal_eval(roles))
+    except (ValueError, SyntaxError):
+        raise ValueError(f"Roles is not a list: {roles!r}") from None
+
 def process_cluster_data(cluster_file):
-    """Processes the cluster data from the CSV file."""
+    """Processes the cluster data from the CSV file.
+
+    Raises ValueError for an unreadable or malformed export rather than
+    returning the rows read before the error, so callers can quarantine the
+    cluster instead of rendering or storing a partial node list.
+    """
     node_info = {}
-    
+
     try:
-        with open(cluster_file, 'r', encoding='utf-16') as file:
-            reader = csv.DictReader(file, delimiter='\t')
-            for row in reader:
+        rows = read_rows(cluster_file)
+    except Exception as e:
+        raise ValueError(f"Cannot read node export {cluster_file}: {e}") from e
+
+    if rows:
+        for number, row in enumerate(rows_to_dicts(rows[1:], rows[0]), start=1):
+            try:
                 node_info[row['Host Name']] = {
                     'CPU': row['Cores'],
                     'Memory': row['Memory (GB)'],
-                    'Node Role': ' '.join(eval(row['Roles']))  # Convert string list to space-separated roles
+                    'Node Role': parse_roles(row['Roles'])  # Convert string list to space-separated roles
                 }
-    except Exception as e:
-        logging.error(f"Error processing cluster data: {e}")
-    
+            except Exception as e:
+                raise ValueError(f"Malformed node export {cluster_file} at data row {number}: {e}") from e
+
     return node_info
 
 def process_node_data(node_info, node_type):
@@ -7,6 +7,7 @@ with a focus on drawing text, lines, and placing images in specific positions.
 All measurements are in millimeters and are converted to pixels based on DPI.
 """
 
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 from typing import Tuple, Union
 from modules.config import DEFAULT_FONT, BOLD_FONT, BASE_DPI
@@ -32,6 +33,35 @@ def mm_to_pixels(mm: float, dpi: int = BASE_DPI) -> int:
     """
     return int((mm * dpi) / 25.4)
 
+@lru_cache(maxsize=None)
+def load_font(font_path: str, size_px: int) -> ImageFont.FreeTypeFont:
+    """
+    Load a TrueType/OpenType font, caching it for the life of the process.
+
+    Args:
+        font_path: Path to the font file
+        size_px: Font size in pixels
+
+    Returns:
+        ImageFont.FreeTypeFont: The loaded font
+    """
+    return ImageFont.truetype(font_path, size_px)
+
+@lru_cache(maxsize=32)
+def load_icon(img_path: str, size: int) -> Image.Image:
+    """
+    Load an image and resize it to size x size pixels, caching the result.
+
+    Args:
+        img_path: Path to the image file
+        size: Size in pixels (both width and height)
+
+    Returns:
+        Image.Image: The resized image (treat as read-only)
+    """
+    with Image.open(img_path) as img:
+        return img.resize((size, size), Image.Resampling.LANCZOS)
+
 def add_text_box(
     draw: ImageDraw.ImageDraw,
     text: str,
@@ -63,7 +93,7 @@ def add_text_box(
         text,
         fill=color,
         anchor='mm',
-        font=ImageFont.truetype(font_path, mm_to_pixels(font_size))
+        font=load_font(font_path, mm_to_pixels(font_size))
     )
 
 def add_rotated_text(
@@ -91,7 +121,7 @@ def add_rotated_text(
     """
     text_img = Image.new('RGBA', (height, width), (0, 0, 0, 0))
     text_draw = ImageDraw.Draw(text_img)
-    font = ImageFont.truetype(DEFAULT_FONT, mm_to_pixels(font_size))
+    font = load_font(DEFAULT_FONT, mm_to_pixels(font_size))
     text_draw.text(
         (height/2, width/2),
         text,
@@ -120,11 +150,10 @@ def add_image_box(
         size: Size in pixels (both width and height)
 
     Note:
-        The image will be resized to size x size pixels using LANCZOS resampling
+        The image will be resized to size x size pixels using LANCZOS resampling.
+        Resized images are cached, so repeated tiles reuse the same icon.
     """
-    img = Image.open(img_path)
-    img = img.resize((size, size), Image.Resampling.LANCZOS)
-    image.paste(img, (x, y))
+    image.paste(load_icon(img_path, size), (x, y))
 
 def add_horizontal_line(
     draw: ImageDraw.ImageDraw,
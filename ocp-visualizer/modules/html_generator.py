@@ -3,13 +3,41 @@ Module for generating HTML output.
 """
 
 import os
-import shutil
+import re
 from airium import Airium
 
-def create_folder(folder_path):
-    """Creates a folder if it doesn't exist."""
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
+from modules.output_writer import OutputWriter
+
+# Host names ending in a number, e.g. prod-worker-001 or node12.example.com
+NUMBERED_NAME = re.compile(r'^(.*?)(\d+)(\D*)$')
+
+# Compact mode: shortest run shown as a range, and group size that starts collapsed
+MIN_RANGE_LENGTH = 3
+COLLAPSE_GROUP_SIZE = 50
+
+def write_report(html_file, html, css_file, openshift_logo, writer=None):
+    """Stages an HTML report and its supporting files with an OutputWriter.
+
+    Without a writer the files are written atomically straight away.
+    """
+    immediate = writer is None
+    if immediate:
+        writer = OutputWriter()
+    output_folder = os.path.dirname(html_file)
+    writer.copy(css_file, output_folder)
+    writer.copy(openshift_logo, output_folder)
+    writer.write(html_file, html)
+    if immediate:
+        writer.flush()
+
+def page_header(a, title):
+    """Generates a header with the logo and a title only."""
+    with a.div(klass="header"):
+        with a.div(klass="logo"):
+            a.img(src="ocp-logo.png", alt="OpenShift Logo", height="100")
+        with a.div(klass="cluster-info"):
+            with a.div(klass="cluster-name"):
+                a(title)
 
 def table_header(a, cluster_name):
     """Generates the table header in the HTML."""
@@ -24,8 +52,65 @@ def table_header(a, cluster_name):
                 a("Infrastructure")
                 a("Worker")
 
-def node_column(a, nodes, node_type):
-    """Generates a column of node information in the HTML."""
+def compress_node_names(node_names):
+    """Collapses numbered host names into ranges without losing any name.
+
+    Returns a list of (first, last, count) in name order. Names only join a
+    range when they share the same prefix, suffix and digit width and their
+    numbers are consecutive, so every name in a range can be rebuilt from
+    its first and last entries. Runs shorter than MIN_RANGE_LENGTH, and names
+    without a trailing number, are returned as (name, name, 1).
+    """
+    runs = []
+    numbered = {}
+    for name in node_names:
+        match = NUMBERED_NAME.match(name)
+        if not match:
+            runs.append((name, name, 1))
+            continue
+        prefix, digits, suffix = match.groups()
+        numbered.setdefault((prefix, suffix, len(digits)), []).append((int(digits), name))
+
+    for entries in numbered.values():
+        entries.sort()
+        start = 0
+        for end in range(1, len(entries) + 1):
+            if end < len(entries) and entries[end][0] == entries[end - 1][0] + 1:
+                continue
+            run = entries[start:end]
+            if len(run) >= MIN_RANGE_LENGTH:
+                runs.append((run[0][1], run[-1][1], len(run)))
+            else:
+                runs.extend((name, name, 1) for _, name in run)
+            start = end
+
+    return sorted(runs)
+
+def node_list(a, node_names, compact=False):
+    """Generates the list of nodes in a spec group, as ranges when compact."""
+    if not compact:
+        for node_name in sorted(node_names):
+            with a.div(klass="node"):
+                with a.div(klass="node-name"):
+                    a(node_name)
+        return
+
+    for first, last, count in compress_node_names(node_names):
+        with a.div(klass="node"):
+            with a.div(klass="node-name"):
+                if count == 1:
+                    a(first)
+                else:
+                    a(f"{first} .. {last}")
+                    with a.span(klass="node-count"):
+                        a(f" ({count:,} nodes)")
+
+def node_column(a, nodes, node_type, compact=False):
+    """Generates a column of node information in the HTML.
+
+    With compact=True, numbered host names are shown as ranges and groups
+    larger than COLLAPSE_GROUP_SIZE start collapsed.
+    """
     total_cpu = 0
     total_memory = 0
     
@@ -65,11 +150,14 @@ def node_column(a, nodes, node_type):
                         with a.div(klass="spec"):
                             a(f"Memory: {group['memory']:.2f} GB")
                     
-                    with a.div(klass="node-list"):
-                        for node_name in sorted(group['nodes']):
-                            with a.div(klass="node"):
-                                with a.div(klass="node-name"):
-                                    a(node_name)
+                    if compact and len(group['nodes']) > COLLAPSE_GROUP_SIZE:
+                        with a.details():
+                            a.summary(_t=f"{len(group['nodes']):,} nodes")
+                            with a.div(klass="node-list"):
+                                node_list(a, group['nodes'], compact)
+                    else:
+                        with a.div(klass="node-list"):
+                            node_list(a, group['nodes'], compact)
     
     return total_cpu, total_memory
 
@@ -90,10 +178,12 @@ def node_footer(a, total_cpu, total_memory, node_type):
             with a.div(klass="total-memory"):
                 a(f"Total Memory: {total_memory:.2f} GB")
 
-def generate_html_report(cluster_id, cluster_name, cluster_version, master_nodes, 
-                        infrastructure_nodes, worker_nodes, file_date, output_folder, 
-                        css_file, openshift_logo):
-    """Generates the complete HTML report for a cluster."""
+def build_html_report(cluster_id, cluster_name, cluster_version, master_nodes,
+                      infrastructure_nodes, worker_nodes, file_date, css_href, compact=False):
+    """Builds the HTML report for a cluster without writing it to disk.
+
+    Returns a tuple of (html, worker_total_cpu).
+    """
     a = Airium()
     a('<!DOCTYPE html>')
     with a.html(lang="en"):
@@ -101,7 +191,7 @@ def generate_html_report(cluster_id, cluster_name, cluster_version, master_nodes
             a.meta(charset="utf-8")
             a.meta(name="viewport", content="width=device-width, initial-scale=1.0")
             a.title(_t=f"Cluster Report - {cluster_name}")
-            a.link(rel="stylesheet", href=css_file)
+            a.link(rel="stylesheet", href=css_href)
         
         with a.body():
             with a.div(klass="container"):
@@ -115,9 +205,9 @@ def generate_html_report(cluster_id, cluster_name, cluster_version, master_nodes
                 
                 with a.div(klass="content"):
                     with a.div(klass="row"):
-                        (master_total_cpu, master_total_memory) = node_column(a, master_nodes, "Control Plane")
-                        (infrastructure_total_cpu, infrastructure_total_memory) = node_column(a, infrastructure_nodes, "Infrastructure")
-                        (worker_total_cpu, worker_total_memory) = node_column(a, worker_nodes, "Worker")
+                        (master_total_cpu, master_total_memory) = node_column(a, master_nodes, "Control Plane", compact)
+                        (infrastructure_total_cpu, infrastructure_total_memory) = node_column(a, infrastructure_nodes, "Infrastructure", compact)
+                        (worker_total_cpu, worker_total_memory) = node_column(a, worker_nodes, "Worker", compact)
 
                     with a.div(klass="footer-row"):
                         node_footer(a, master_total_cpu, master_total_memory, "Control Plane")
@@ -127,14 +217,141 @@ def generate_html_report(cluster_id, cluster_name, cluster_version, master_nodes
                 with a.div(klass="file-date"):
                     a(f"Current as of: {file_date}")
 
-    # Create output folder and copy supporting files
-    create_folder(output_folder)
-    shutil.copy2(css_file, output_folder)
-    shutil.copy2(openshift_logo, output_folder)
+    return str(a), worker_total_cpu
 
-    # Write the HTML file
+def generate_html_report(cluster_id, cluster_name, cluster_version, master_nodes, 
+                        infrastructure_nodes, worker_nodes, file_date, output_folder, 
+                        css_file, openshift_logo, compact=False, writer=None):
+    """Generates the complete HTML report for a cluster."""
+    html, worker_total_cpu = build_html_report(
+        cluster_id, cluster_name, cluster_version, master_nodes,
+        infrastructure_nodes, worker_nodes, file_date, css_file, compact
+    )
+
+    # Write the HTML file and its supporting files
     html_file = os.path.join(output_folder, f"{cluster_name}.html")
-    with open(html_file, "w") as file:
-        file.write(str(a))
-    
-    return worker_total_cpu 
\ No newline at end of file
+    write_report(html_file, html, css_file, openshift_logo, writer)
+
+    return worker_total_cpu
+
+def diff_section(a, title, entries):
+    """Generates a titled list of node changes in the HTML delta report."""
+    with a.div(klass="node-group"):
+        with a.div(klass="node-specs"):
+            with a.div(klass="spec"):
+                a(f"{title}: {len(entries)}")
+        with a.div(klass="node-list"):
+            for text in entries:
+                with a.div(klass="node"):
+                    with a.div(klass="node-name"):
+                        a(text)
+
+def generate_html_diff_report(cluster_id, cluster_name, diff, old_date, new_date,
+                              output_folder, css_file, openshift_logo, writer=None):
+    """Generates an HTML delta report from a node_diff.diff_nodes result."""
+    a = Airium()
+    a('<!DOCTYPE html>')
+    with a.html(lang="en"):
+        with a.head():
+            a.meta(charset="utf-8")
+            a.meta(name="viewport", content="width=device-width, initial-scale=1.0")
+            a.title(_t=f"Cluster Changes - {cluster_name}")
+            a.link(rel="stylesheet", href=css_file)
+
+        with a.body():
+            with a.div(klass="container"):
+                with a.div(klass="cluster-header"):
+                    with a.div(klass="cluster-id"):
+                        a(f"Cluster ID: {cluster_id}")
+                    with a.div(klass="cluster-version"):
+                        a(f"Changes: {old_date} to {new_date}")
+
+                table_header(a, cluster_name)
+
+                with a.div(klass="footer-row"):
+                    for role, delta in diff['roles'].items():
+                        column_class = {
+                            "Control Plane": "left-column",
+                            "Infrastructure": "center-column",
+                            "Worker": "right-column"
+                        }.get(role, "column")
+                        with a.div(klass=f"node-footer {column_class}"):
+                            with a.div(klass="node-type"):
+                                a(f"{role} ({delta['count']:+d} nodes)")
+                            with a.div(klass="total-specs"):
+                                with a.div(klass="total-cpu"):
+                                    a(f"vCPU: {delta['cpu']:+,d}")
+                                with a.div(klass="total-memory"):
+                                    a(f"Memory: {delta['memory']:+,.2f} GB")
+
+                with a.div(klass="content"):
+                    diff_section(a, "Added", [
+                        f"{host} - CPU: {cpu}, Memory: {memory:.2f} GB, Roles: {' '.join(roles)}"
+                        for host, (cpu, memory), roles in diff['added']
+                    ])
+                    diff_section(a, "Removed", [
+                        f"{host} - CPU: {cpu}, Memory: {memory:.2f} GB, Roles: {' '.join(roles)}"
+                        for host, (cpu, memory), roles in diff['removed']
+                    ])
+                    diff_section(a, "Resized", [
+                        f"{host} - CPU: {old_cpu} to {new_cpu}, Memory: {old_memory:.2f} GB to {new_memory:.2f} GB"
+                        for host, (old_cpu, old_memory), (new_cpu, new_memory) in diff['resized']
+                    ])
+                    diff_section(a, "Re-roled", [
+                        f"{host} - {' '.join(old_roles)} to {' '.join(new_roles)}"
+                        for host, old_roles, new_roles in diff['re_roled']
+                    ])
+
+                with a.div(klass="file-date"):
+                    a(f"Unchanged nodes: {diff['unchanged']}")
+
+    # Write the HTML file and its supporting files
+    html_file = os.path.join(output_folder, f"{cluster_name}_diff_{old_date}_{new_date}.html")
+    write_report(html_file, str(a), css_file, openshift_logo, writer)
+
+    return html_file
+
+def generate_html_lifecycle_report(account_name, plan, output_folder, css_file, openshift_logo,
+                                   writer=None):
+    """Generates an HTML lifecycle report of upgrade paths for an account's clusters."""
+    a = Airium()
+    a('<!DOCTYPE html>')
+    with a.html(lang="en"):
+        with a.head():
+            a.meta(charset="utf-8")
+            a.meta(name="viewport", content="width=device-width, initial-scale=1.0")
+            a.title(_t=f"Cluster Lifecycle - {account_name}")
+            a.link(rel="stylesheet", href=css_file)
+
+        with a.body():
+            with a.div(klass="container"):
+                page_header(a, f"{account_name} Lifecycle")
+
+                with a.div(klass="content"):
+                    for entry in plan:
+                        with a.div(klass="node-group"):
+                            with a.div(klass="node-specs"):
+                                with a.div(klass="spec"):
+                                    a(f"Cluster ID: {entry['cluster_id']}")
+                                with a.div(klass="spec"):
+                                    a(f"Version: {entry['version']}{' (EOL)' if entry['eol'] else ''}")
+                                with a.div(klass="spec"):
+                                    a(f"Update Risk: {entry['update_risk']}")
+
+                            with a.div(klass="node-list"):
+                                with a.div(klass="node"):
+                                    with a.div(klass="node-name"):
+                                        if entry['path'] is None:
+                                            a(f"No upgrade path to {entry['target']} in the update graph")
+                                        elif len(entry['path']) == 1:
+                                            a(f"Up to date ({entry['target']})")
+                                        else:
+                                            hops = len(entry['path']) - 1
+                                            a(f"{' &rarr; '.join(entry['path'])} "
+                                              f"({hops} update{'s' if hops != 1 else ''})")
+
+    # Write the HTML file and its supporting files
+    html_file = os.path.join(output_folder, f"{account_name}_lifecycle.html")
+    write_report(html_file, str(a), css_file, openshift_logo, writer)
+
+    return html_file
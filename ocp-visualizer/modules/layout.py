@@ -3,40 +3,74 @@
 Layout management for the reference image generator.
 """
 
+import io
 import logging
 import os
 from PIL import Image, ImageDraw
 from typing import Tuple
 
-from modules.config import *
+from modules.config import (
+    DPI, IMAGE_WIDTH_MM, IMAGE_HEIGHT_MM, TEXT_COLOR, LINE_COLOR,
+    TITLE_BOX_HEIGHT_MM, TITLE_BOX_MARGIN_MM, ICON_BOX_SIZE_MM,
+    LEFT_BOX_SIZE_MM, LEFT_BOX_START_TOP_MM, RIGHT_COLUMN_WIDTH_MM,
+    LINE_WIDTH_PX, HORIZONTAL_LINE_START_X_MM, HORIZONTAL_LINE_END_X_MM,
+    HORIZONTAL_LINE_Y_POSITIONS_MM
+)
+from modules.output_writer import atomic_write
 from modules.functions import mm_to_pixels, add_text_box, add_rotated_text, add_image_box, add_horizontal_line
 
 #def generate_reference_image(input_path, output_path, node_counts=None, cluster_name=None, version=None, platform=None, support=None, worker_total_cpu=None, variant="?"):
-def generate_reference_image(output_path, node_counts=None, cluster_name=None, version=None, platform=None, support=None, worker_total_cpu=None, variant="?"):
-    """Generate a reference image with the specified parameters."""
+def generate_reference_image(output_path, node_counts=None, cluster_name=None, version=None, platform=None, support=None, worker_total_cpu=None, variant="?", writer=None, cache=None):
+    """Generate a reference image with the specified parameters.
+
+    With an OutputWriter the image is staged for its next flush, otherwise it
+    is written atomically straight away. With a TileCache, cached tiles and
+    base layers are reused.
+    """
     try:
-        # Create layout with provided parameters
-        layout = ReferenceImageLayout(
+        data = render_reference_image(
             node_counts=node_counts,
             cluster_name=cluster_name,
             version=version,
             platform=platform,
             support=support,
             worker_total_cpu=worker_total_cpu,
-            variant=variant
+            variant=variant,
+            cache=cache
         )
-        
-        # Draw all elements
-        layout.draw_all_elements()
-        
+
         # Save the image
-        layout.save(output_path)
-        
+        if writer is not None:
+            writer.write(output_path, data)
+        else:
+            atomic_write(output_path, data)
+
         return True
     except Exception as e:
         logging.error(f"Error generating reference image: {e}")
         return False
 
+def render_reference_image(node_counts=None, cluster_name=None, version=None, platform=None, support=None, worker_total_cpu=None, variant="?", cache=None):
+    """Render a reference image in memory and return it as PNG bytes."""
+    inputs = {
+        'node_counts': node_counts,
+        'cluster_name': cluster_name,
+        'version': version,
+        'platform': platform,
+        'support': support,
+        'worker_total_cpu': worker_total_cpu,
+        'variant': variant
+    }
+    if cache is not None:
+        return cache.render(**inputs)
+
+    layout = ReferenceImageLayout(**inputs)
+    layout.draw_all_elements()
+
+    buffer = io.BytesIO()
+    layout.image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
 def get_icon_path(support_level: str) -> str:
     """Get the path to the appropriate icon based on support level.
     
@@ -146,6 +180,20 @@ class ReferenceImageLayout:
     
     def draw_all_elements(self) -> None:
         """Draw all elements on the image."""
+        self.draw_base_layer()
+        self.draw_name_layer()
+
+    def use_base_layer(self, image) -> None:
+        """Draw on a copy of an already rendered base layer."""
+        self.image = image.copy()
+        self.draw = ImageDraw.Draw(self.image)
+
+    def draw_base_layer(self) -> None:
+        """Draw everything except the cluster name.
+
+        The name box shares no pixels with the icon or the lines, so the base
+        layer can be reused for every cluster with the same other inputs.
+        """
         try:
             # Add all elements
             formatted_cpu = "{:,}".format(self.worker_total_cpu)
@@ -202,15 +250,6 @@ class ReferenceImageLayout:
                 bold=False
             )
             
-            add_text_box(
-                self.draw, self.cluster_name,
-                0, self.name_box_top,
-                self.pixel_width, self.name_box_height,
-                font_size=font_size,
-                color=TEXT_COLOR,
-                bold=True  # Only the cluster name is bold
-            )
-            
             # Get the appropriate icon based on support level
             icon_path = get_icon_path(self.support)
             add_image_box(
@@ -229,16 +268,33 @@ class ReferenceImageLayout:
                     width=LINE_WIDTH_PX
                 )
             
-            self.logger.debug("All elements drawn successfully")
+            self.logger.debug("Base layer drawn successfully")
             
         except Exception as e:
             self.logger.error(f"Error drawing elements: {e}")
             raise
     
+    def draw_name_layer(self) -> None:
+        """Draw the cluster name box."""
+        try:
+            add_text_box(
+                self.draw, self.cluster_name,
+                0, self.name_box_top,
+                self.pixel_width, self.name_box_height,
+                font_size=7.5,
+                color=TEXT_COLOR,
+                bold=True  # Only the cluster name is bold
+            )
+        except Exception as e:
+            self.logger.error(f"Error drawing name box: {e}")
+            raise
+
     def save(self, output_path) -> None:
         """Save the image to file."""
         try:
-            self.image.save(output_path, 'PNG')
+            buffer = io.BytesIO()
+            self.image.save(buffer, 'PNG')
+            atomic_write(output_path, buffer.getvalue())
             self.logger.info(f"Image saved successfully to {output_path}")
         except Exception as e:
             self.logger.error(f"Error saving image: {e}")
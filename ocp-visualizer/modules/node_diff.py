@@ -0,0 +1,113 @@
+"""
+Module for comparing two node exports of the same cluster.
+"""
+
+import logging
+
+from modules.data_processor import process_node_data
+
+# Role buckets in report order, mapped to their process_node_data node type
+ROLE_TYPES = {
+    "Control Plane": "Master",
+    "Infrastructure": "Infra",
+    "Worker": "Worker",
+}
+
+def node_fingerprint(data):
+    """Returns the (spec, roles) fingerprint of a node from process_cluster_data.
+
+    Both parts are hashable tuples, so two nodes can be compared without
+    looking at the individual fields again.
+    """
+    spec = (int(float(data.get('CPU', 0))), round(float(data.get('Memory', 0)), 2))
+    roles = tuple(sorted(data.get('Node Role', '').split()))
+    return spec, roles
+
+def role_totals(node_info):
+    """Returns {role: (count, vcpu, memory)} using the same role rules as the reports."""
+    totals = {}
+    for role, node_type in ROLE_TYPES.items():
+        nodes = process_node_data(node_info, node_type)
+        totals[role] = (
+            len(nodes),
+            sum(int(float(data.get('CPU', 0))) for data in nodes.values()),
+            sum(float(data.get('Memory', 0)) for data in nodes.values()),
+        )
+    return totals
+
+def diff_nodes(old_info, new_info):
+    """Compares two node exports, indexed by Host Name, in linear time.
+
+    Returns a dict with:
+        added:     sorted list of (host, spec, roles) only in the new export
+        removed:   sorted list of (host, spec, roles) only in the old export
+        resized:   sorted list of (host, old spec, new spec)
+        re_roled:  sorted list of (host, old roles, new roles)
+        unchanged: number of nodes present in both with the same fingerprint
+        roles:     {role: {'count', 'cpu', 'memory'} deltas} per report column
+    where spec is (vCPU, memory GB) and roles is a tuple of role names.
+    """
+    old_index = {host: node_fingerprint(data) for host, data in old_info.items()}
+
+    added, resized, re_roled = [], [], []
+    unchanged = 0
+    for host, data in new_info.items():
+        new_spec, new_roles = node_fingerprint(data)
+        previous = old_index.pop(host, None)
+        if previous is None:
+            added.append((host, new_spec, new_roles))
+            continue
+
+        old_spec, old_roles = previous
+        if previous == (new_spec, new_roles):
+            unchanged += 1
+            continue
+        if old_spec != new_spec:
+            resized.append((host, old_spec, new_spec))
+        if old_roles != new_roles:
+            re_roled.append((host, old_roles, new_roles))
+
+    # Whatever is left in the old index is gone from the new export
+    removed = [(host, spec, roles) for host, (spec, roles) in old_index.items()]
+
+    old_totals = role_totals(old_info)
+    new_totals = role_totals(new_info)
+    roles = {}
+    for role in ROLE_TYPES:
+        old_count, old_cpu, old_memory = old_totals[role]
+        new_count, new_cpu, new_memory = new_totals[role]
+        roles[role] = {
+            'count': new_count - old_count,
+            'cpu': new_cpu - old_cpu,
+            'memory': round(new_memory - old_memory, 2),
+        }
+
+    logging.debug(f"Node diff: {len(added)} added, {len(removed)} removed, "
+                  f"{len(resized)} resized, {len(re_roled)} re-roled, {unchanged} unchanged")
+
+    return {
+        'added': sorted(added),
+        'removed': sorted(removed),
+        'resized': sorted(resized),
+        're_roled': sorted(re_roled),
+        'unchanged': unchanged,
+        'roles': roles,
+    }
+
+def format_diff(diff):
+    """Formats a diff from diff_nodes as plain text lines."""
+    lines = []
+    for role, delta in diff['roles'].items():
+        lines.append(f"{role}: {delta['count']:+d} nodes, {delta['cpu']:+,d} vCPU, "
+                     f"{delta['memory']:+,.2f} GB")
+    for host, (cpu, memory), roles in diff['added']:
+        lines.append(f"+ {host} ({cpu} vCPU, {memory:.2f} GB, {' '.join(roles)})")
+    for host, (cpu, memory), roles in diff['removed']:
+        lines.append(f"- {host} ({cpu} vCPU, {memory:.2f} GB, {' '.join(roles)})")
+    for host, (old_cpu, old_memory), (new_cpu, new_memory) in diff['resized']:
+        lines.append(f"~ {host} resized {old_cpu} vCPU/{old_memory:.2f} GB -> "
+                     f"{new_cpu} vCPU/{new_memory:.2f} GB")
+    for host, old_roles, new_roles in diff['re_roled']:
+        lines.append(f"~ {host} roles {' '.join(old_roles)} -> {' '.join(new_roles)}")
+    lines.append(f"{diff['unchanged']} nodes unchanged")
+    return lines
@@ -0,0 +1,188 @@
+"""
+Module for the fleet-wide node index.
+
+Every node export is read once with process_cluster_data and its nodes are
+stored in a local SQLite database with three inverted indexes:
+
+    - host name -> cluster
+    - (role, CPU, memory) -> nodes
+    - role -> clusters, with the number of nodes in each
+
+Each export's size and modification time are recorded, so a rebuild only
+re-reads the exports that changed. Roles are the ones listed in the export
+(e.g. master, control-plane, infra, worker), and memory is indexed rounded
+to the nearest GB.
+"""
+
+import os
+from datetime import datetime
+
+from modules.data_processor import process_cluster_data
+from modules.sqlite_db import SQLiteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    cluster_id TEXT PRIMARY KEY,
+    account TEXT,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    node_count INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS nodes (
+    cluster_id TEXT NOT NULL,
+    host_name TEXT NOT NULL,
+    cpu INTEGER,
+    memory REAL,
+    roles TEXT,
+    PRIMARY KEY (cluster_id, host_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_nodes_host ON nodes (host_name);
+
+CREATE TABLE IF NOT EXISTS node_specs (
+    role TEXT NOT NULL,
+    cpu INTEGER NOT NULL,
+    memory_gb INTEGER NOT NULL,
+    cluster_id TEXT NOT NULL,
+    host_name TEXT NOT NULL,
+    PRIMARY KEY (role, cpu, memory_gb, cluster_id, host_name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS role_clusters (
+    role TEXT NOT NULL,
+    cluster_id TEXT NOT NULL,
+    node_count INTEGER NOT NULL,
+    PRIMARY KEY (role, cluster_id)
+) WITHOUT ROWID;
+"""
+
+class NodeIndex(SQLiteDatabase):
+    """Persistent inverted indexes over the nodes of every indexed cluster."""
+
+    SCHEMA = SCHEMA
+
+    def _remove_cluster(self, cluster_id):
+        """Deletes every entry for a cluster."""
+        for table in ('sources', 'nodes', 'node_specs', 'role_clusters'):
+            self.conn.execute(f"DELETE FROM {table} WHERE cluster_id = ?", (cluster_id,))
+
+    def _add_cluster(self, cluster_id, account, path, stat, node_info):
+        """Indexes the nodes of one cluster, replacing any previous entries."""
+        self._remove_cluster(cluster_id)
+
+        nodes = []
+        specs = []
+        role_counts = {}
+        for host_name, data in node_info.items():
+            cpu = int(float(data.get('CPU') or 0))
+            memory = round(float(data.get('Memory') or 0), 2)
+            roles = data.get('Node Role', '')
+            nodes.append((cluster_id, host_name, cpu, memory, roles))
+            for role in set(roles.split()):
+                specs.append((role, cpu, round(memory), cluster_id, host_name))
+                role_counts[role] = role_counts.get(role, 0) + 1
+
+        self.conn.executemany("INSERT INTO nodes VALUES (?, ?, ?, ?, ?)", nodes)
+        self.conn.executemany("INSERT INTO node_specs VALUES (?, ?, ?, ?, ?)", specs)
+        self.conn.executemany(
+            "INSERT INTO role_clusters VALUES (?, ?, ?)",
+            [(role, cluster_id, count) for role, count in role_counts.items()]
+        )
+        self.conn.execute(
+            "INSERT INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (cluster_id, account, os.path.abspath(path), stat.st_size, stat.st_mtime_ns, len(node_info),
+             datetime.now().isoformat(timespec='seconds'))
+        )
+
+    def update(self, exports):
+        """Brings the index up to date with {cluster_id: (account, csv path)}.
+
+        Exports whose size and mtime match the index are skipped. Clusters whose
+        indexed export no longer exists are dropped. Returns a dict with the
+        number of clusters 'indexed', 'unchanged', 'missing', 'failed' (malformed
+        or without nodes) and 'removed'.
+        """
+        counts = {'indexed': 0, 'unchanged': 0, 'missing': 0, 'failed': 0, 'removed': 0}
+        known = {
+            cluster_id: (path, size, mtime_ns)
+            for cluster_id, path, size, mtime_ns in self.conn.execute(
+                "SELECT cluster_id, path, size, mtime_ns FROM sources"
+            )
+        }
+
+        with self.conn:
+            for cluster_id, (account, path) in exports.items():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    counts['missing'] += 1
+                    continue
+                if known.get(cluster_id) == (os.path.abspath(path), stat.st_size, stat.st_mtime_ns):
+                    counts['unchanged'] += 1
+                    continue
+
+                try:
+                    node_info = process_cluster_data(path)
+                except ValueError as e:
+                    self.logger.error(f"{e}, leaving cluster {cluster_id} as it was")
+                    counts['failed'] += 1
+                    continue
+                if not node_info:
+                    self.logger.error(f"No nodes read from {path}, leaving cluster {cluster_id} as it was")
+                    counts['failed'] += 1
+                    continue
+                self._add_cluster(cluster_id, account, path, stat, node_info)
+                counts['indexed'] += 1
+
+            for cluster_id, (path, _, _) in known.items():
+                if cluster_id not in exports and not os.path.exists(path):
+                    self._remove_cluster(cluster_id)
+                    counts['removed'] += 1
+
+        self.logger.info(f"Node index updated: {counts}")
+        return counts
+
+    def find_host(self, host_name):
+        """Returns the clusters a host belongs to. '*' and '?' act as wildcards."""
+        operator = 'GLOB' if any(char in host_name for char in '*?[') else '='
+        cursor = self.conn.execute(
+            f"SELECT n.host_name, n.cluster_id, s.account, n.cpu, n.memory, n.roles "
+            f"FROM nodes n JOIN sources s USING (cluster_id) "
+            f"WHERE n.host_name {operator} ? ORDER BY n.host_name, n.cluster_id",
+            (host_name,)
+        )
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall()
+
+    def find_spec(self, cpu, memory_gb, role=None):
+        """Returns the nodes with a CPU count and memory (to the nearest GB), optionally of one role."""
+        if role:
+            cursor = self.conn.execute(
+                "SELECT n.cluster_id, s.account, n.host_name, n.cpu, n.memory, n.roles "
+                "FROM node_specs p JOIN nodes n USING (cluster_id, host_name) JOIN sources s USING (cluster_id) "
+                "WHERE p.role = ? AND p.cpu = ? AND p.memory_gb = ? ORDER BY n.cluster_id, n.host_name",
+                (role, cpu, round(memory_gb))
+            )
+        else:
+            # Listing the roles lets every lookup use the (role, cpu, memory_gb) key
+            cursor = self.conn.execute(
+                "SELECT DISTINCT n.cluster_id, s.account, n.host_name, n.cpu, n.memory, n.roles "
+                "FROM node_specs p JOIN nodes n USING (cluster_id, host_name) JOIN sources s USING (cluster_id) "
+                "WHERE p.role IN (SELECT DISTINCT role FROM role_clusters) AND p.cpu = ? AND p.memory_gb = ? "
+                "ORDER BY n.cluster_id, n.host_name",
+                (cpu, round(memory_gb))
+            )
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall()
+
+    def find_role(self, role):
+        """Returns the clusters with nodes of a role and how many each has."""
+        cursor = self.conn.execute(
+            "SELECT r.cluster_id, s.account, r.node_count FROM role_clusters r JOIN sources s USING (cluster_id) "
+            "WHERE r.role = ? ORDER BY s.account, r.cluster_id",
+            (role,)
+        )
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall()
@@ -0,0 +1,202 @@
+"""
+Module for writing report files safely and in batches.
+
+Reports usually go to a folder that a sync client (e.g. Google Drive)
+uploads, often on networked storage. Writing each file through a temporary
+file and an atomic rename means a crash never leaves a half-written report
+behind, and staging writes until flush() lets a run create each folder once,
+copy the shared stylesheet and logo once, and skip files whose contents have
+not changed (which the sync client would otherwise upload again).
+
+Whether a file changed is decided from a local record of the size, mtime and
+hash of every file written, so the existing report is only stat'ed, never
+read back (which on a streamed Drive folder would download it).
+"""
+
+import os
+import io
+import json
+import hashlib
+import logging
+import tempfile
+
+from modules.config import OUTPUT_DIGESTS_PATH
+
+_default_mode = None
+
+def default_file_mode():
+    """Returns the mode open() would give a new file (0o666 less the umask), read once."""
+    global _default_mode
+    if _default_mode is None:
+        umask = os.umask(0)
+        os.umask(umask)
+        _default_mode = 0o666 & ~umask
+    return _default_mode
+
+def atomic_write(path, data):
+    """Writes bytes to path via a temporary file in the same folder and a rename.
+
+    mkstemp creates files as 0600, so the temporary file is given the mode of
+    the file it replaces, or the mode a plain open() would have used.
+    """
+    folder = os.path.dirname(path) or '.'
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = default_file_mode()
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def file_digest(data):
+    """Returns the hash recorded for the contents of an output file."""
+    return hashlib.sha256(data).hexdigest()
+
+class OutputWriter:
+    """Stages output files and writes them atomically in batches.
+
+    With bundle=True, each output folder (one per account) is written as a
+    single '<folder>_reports.zip' archive instead of individual files. Every
+    flush rewrites the archive with the staged files merged into the entries
+    it already holds, so batches, resumed runs and watch mode add to the
+    bundle rather than truncating it.
+    """
+
+    def __init__(self, bundle=False, batch_size=25, digests_path=OUTPUT_DIGESTS_PATH):
+        """Initialize an empty writer."""
+        self.logger = logging.getLogger(__name__)
+        self.bundle = bundle
+        self.batch_size = batch_size
+        self.digests_path = digests_path
+        self.digests = None     # path -> [size, mtime_ns, sha256], loaded on first use
+        self.pending = {}       # path -> bytes, in staging order
+        self.asset_cache = {}   # source path -> bytes
+        self.created = set()    # folders known to exist
+
+    def write(self, path, data):
+        """Stages a file. Text is encoded as UTF-8."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.pending[path] = data
+
+    def copy(self, source, folder):
+        """Stages a copy of a shared asset (stylesheet, logo) into folder."""
+        if source not in self.asset_cache:
+            with open(source, 'rb') as file:
+                self.asset_cache[source] = file.read()
+        self.pending[os.path.join(folder, os.path.basename(source))] = self.asset_cache[source]
+
+    def should_flush(self, clusters_pending):
+        """Returns True when enough clusters are staged to write a batch."""
+        return clusters_pending >= self.batch_size
+
+    def _ensure_folder(self, folder):
+        """Creates a folder once per writer."""
+        if folder not in self.created:
+            os.makedirs(folder, exist_ok=True)
+            self.created.add(folder)
+
+    def _load_digests(self):
+        """Reads the record of files written by earlier runs."""
+        try:
+            with open(self.digests_path, 'r', encoding='utf-8') as file:
+                self.digests = json.load(file)
+        except FileNotFoundError:
+            self.digests = {}
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Ignoring unreadable output digests {self.digests_path}: {e}")
+            self.digests = {}
+
+    def _save_digests(self):
+        """Writes the record of files written back to disk."""
+        try:
+            os.makedirs(os.path.dirname(self.digests_path), exist_ok=True)
+            atomic_write(self.digests_path, json.dumps(self.digests).encode('utf-8'))
+        except OSError as e:
+            self.logger.error(f"Error writing output digests {self.digests_path}: {e}")
+
+    def _is_unchanged(self, path, digest):
+        """Returns True if path is still the file recorded with this digest."""
+        recorded = self.digests.get(os.path.abspath(path))
+        if recorded is None or recorded[2] != digest:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        # Edited or replaced since it was recorded
+        return [stat.st_size, stat.st_mtime_ns] == recorded[:2]
+
+    def _record(self, path, digest):
+        """Records a file just written."""
+        stat = os.stat(path)
+        self.digests[os.path.abspath(path)] = [stat.st_size, stat.st_mtime_ns, digest]
+
+    def _existing_entries(self, bundle_path):
+        """Yields (name, bytes) for every entry of an existing bundle, if there is one."""
+        import zipfile
+
+        try:
+            with zipfile.ZipFile(bundle_path) as archive:
+                for info in archive.infolist():
+                    yield info.filename, archive.read(info)
+        except FileNotFoundError:
+            return
+        except zipfile.BadZipFile as e:
+            self.logger.error(f"Replacing unreadable bundle {bundle_path}: {e}")
+
+    def flush(self):
+        """Writes everything staged so far and returns the paths written."""
+        if not self.pending:
+            return []
+
+        written = []
+        if self.bundle:
+            import zipfile
+
+            folders = {}
+            for path, data in self.pending.items():
+                folders.setdefault(os.path.dirname(path), []).append((os.path.basename(path), data))
+            for folder, files in folders.items():
+                bundle_path = os.path.join(folder, f"{os.path.basename(folder)}_reports.zip")
+                staged_names = {name for name, _ in files}
+                buffer = io.BytesIO()
+                with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for name, data in self._existing_entries(bundle_path):
+                        if name not in staged_names:
+                            archive.writestr(name, data)
+                    for name, data in files:
+                        archive.writestr(name, data)
+                self._ensure_folder(folder)
+                atomic_write(bundle_path, buffer.getvalue())
+                written.append(bundle_path)
+        else:
+            if self.digests is None:
+                self._load_digests()
+            skipped = 0
+            try:
+                for path, data in self.pending.items():
+                    self._ensure_folder(os.path.dirname(path))
+                    digest = file_digest(data)
+                    if self._is_unchanged(path, digest):
+                        skipped += 1
+                        continue
+                    atomic_write(path, data)
+                    self._record(path, digest)
+                    written.append(path)
+            finally:
+                if written:
+                    self._save_digests()
+            self.logger.debug(f"Wrote {len(written)} files, {skipped} unchanged")
+
+        self.pending.clear()
+        return written
@@ -0,0 +1,203 @@
+"""
+Module for a content-addressed cache of rendered reference tiles.
+
+Clusters in the same account often produce identical tiles apart from the
+name box. Tiles are cached at two levels, both keyed by a hash of the
+ReferenceImageLayout inputs:
+
+    - the finished PNG, keyed by every input, so an unchanged cluster is
+      never drawn or encoded again;
+    - the base layer (everything but the name box), keyed by every input
+      except the cluster name, so a new cluster that matches an existing
+      one only needs its name drawn.
+
+Base layers are kept in memory for the life of the process. With a cache
+directory, both levels are also stored on disk and shared by every process
+using that directory. Files are written atomically, and the least recently
+used ones are removed once the directory grows past its size limit.
+"""
+
+import io
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from modules.config import DEFAULT_FONT, BOLD_FONT, IMAGES_DIR
+from modules.output_writer import atomic_write
+
+# Bump when the drawing code changes in a way the fingerprint below misses
+CACHE_VERSION = 1
+
+# Files whose contents affect how a tile looks
+LAYOUT_SOURCES = [
+    os.path.join(os.path.dirname(__file__), 'layout.py'),
+    os.path.join(os.path.dirname(__file__), 'functions.py'),
+    os.path.join(os.path.dirname(__file__), 'config.py'),
+    DEFAULT_FONT,
+    BOLD_FONT,
+]
+
+_layout_fingerprint = None
+
+def layout_fingerprint():
+    """Returns a fingerprint of the layout code, fonts and icons, computed once per process."""
+    global _layout_fingerprint
+    if _layout_fingerprint is None:
+        paths = list(LAYOUT_SOURCES)
+        try:
+            paths += sorted(entry.path for entry in os.scandir(IMAGES_DIR) if entry.is_file())
+        except OSError:
+            pass
+        signature = [CACHE_VERSION]
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                signature.append((os.path.basename(path), None, None))
+        _layout_fingerprint = json.dumps(signature)
+    return _layout_fingerprint
+
+def tile_key(inputs):
+    """Returns the content hash for a dict of ReferenceImageLayout inputs."""
+    payload = json.dumps([layout_fingerprint(), inputs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class TileCache:
+    """Renders reference tiles, reusing finished tiles and base layers.
+
+    Safe to share between the threads of the report server.
+    """
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024, max_layers=8):
+        """Initialize the cache, optionally backed by a shared directory."""
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_layers = max_layers
+        self.layers = OrderedDict()   # base key -> PIL image
+        self.lock = threading.Lock()
+        self.stats = {'tile_hits': 0, 'layer_hits': 0, 'misses': 0}
+        self.disk_bytes = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.disk_bytes = sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        """Returns (mtime_ns, path, size) for every cached file on disk."""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.is_file() and entry.name.endswith('.png'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, entry.path, stat.st_size))
+        return entries
+
+    def _path(self, kind, key):
+        """Returns the on-disk path for a cached tile or layer."""
+        return os.path.join(self.directory, f"{kind}-{key}.png")
+
+    def _read(self, kind, key):
+        """Returns cached bytes from disk, marking them as recently used."""
+        if not self.directory:
+            return None
+        path = self._path(kind, key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _store(self, kind, key, data):
+        """Stores bytes on disk and evicts least recently used files if needed."""
+        if not self.directory:
+            return
+        try:
+            atomic_write(self._path(kind, key), data)
+        except OSError as e:
+            self.logger.error(f"Error writing render cache entry: {e}")
+            return
+        self.disk_bytes += len(data)
+        if self.disk_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Removes the least recently used files until the cache is back under 90% of its limit."""
+        entries = sorted(self._entries())
+        self.disk_bytes = sum(size for _, _, size in entries)
+        target = self.max_bytes * 0.9
+        for _, path, size in entries:
+            if self.disk_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self.disk_bytes -= size
+            except FileNotFoundError:
+                # Another process got there first
+                self.disk_bytes -= size
+        self.logger.debug(f"Render cache evicted down to {self.disk_bytes} bytes")
+
+    def _base_layer(self, inputs):
+        """Returns the base layer for inputs from memory, disk, or by drawing it."""
+        from PIL import Image
+        from modules.layout import ReferenceImageLayout
+
+        base_inputs = {name: value for name, value in inputs.items() if name != 'cluster_name'}
+        key = tile_key(base_inputs)
+
+        with self.lock:
+            image = self.layers.get(key)
+            if image is not None:
+                self.layers.move_to_end(key)
+                self.stats['layer_hits'] += 1
+                return image
+
+        data = self._read('base', key)
+        if data is not None:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+            self.stats['layer_hits'] += 1
+        else:
+            layout = ReferenceImageLayout(**base_inputs)
+            layout.draw_base_layer()
+            image = layout.image
+            if self.directory:
+                buffer = io.BytesIO()
+                image.save(buffer, 'PNG')
+                self._store('base', key, buffer.getvalue())
+            self.stats['misses'] += 1
+
+        with self.lock:
+            self.layers[key] = image
+            if len(self.layers) > self.max_layers:
+                self.layers.popitem(last=False)
+        return image
+
+    def render(self, **inputs):
+        """Returns PNG bytes for a tile with the given ReferenceImageLayout inputs."""
+        from modules.layout import ReferenceImageLayout
+
+        key = tile_key(inputs)
+        data = self._read('tile', key)
+        if data is not None:
+            self.stats['tile_hits'] += 1
+            return data
+
+        layout = ReferenceImageLayout(**inputs)
+        layout.use_base_layer(self._base_layer(inputs))
+        layout.draw_name_layer()
+
+        buffer = io.BytesIO()
+        layout.image.save(buffer, 'PNG')
+        data = buffer.getvalue()
+        self._store('tile', key, data)
+        return data
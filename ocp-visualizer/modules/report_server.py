@@ -0,0 +1,269 @@
+"""
+Module for serving cluster reports on demand over HTTP.
+"""
+
+import os
+import html
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from modules.config import CSS_DIR, IMAGES_DIR
+from modules.data_processor import (
+    read_cluster_csv_file,
+    merge_cluster_data,
+    build_directory_index,
+    resolve_cluster_csv,
+    get_file_creation_date,
+    process_cluster_data,
+    process_node_data,
+    get_cluster_name
+)
+from modules.html_generator import build_html_report
+from modules.layout import render_reference_image
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.png': 'image/png',
+}
+
+class RenderCache:
+    """A thread-safe LRU cache bounded by the total size of the cached bodies.
+
+    Each entry is stored with the fingerprint of the inputs it was rendered
+    from, and is treated as a miss once the fingerprint no longer matches.
+    """
+
+    def __init__(self, max_bytes):
+        """Initialize an empty cache holding at most max_bytes of content."""
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, fingerprint):
+        """Returns the cached body for key, or None if missing or stale."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != fingerprint:
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, fingerprint, body):
+        """Stores body for key, evicting least recently used entries as needed."""
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (fingerprint, body)
+            self.total_bytes += len(body)
+            while self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        """Removes an entry. The caller must hold the lock."""
+        _, body = self.entries.pop(key)
+        self.total_bytes -= len(body)
+
+def file_fingerprint(path):
+    """Returns a cheap (size, mtime_ns) fingerprint of a file or directory, or None if missing."""
+    try:
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return None
+
+class ReportServer:
+    """Renders cluster pages and reference tiles only when they are requested."""
+
+    def __init__(self, crosstab_files, input_dirs, cache_bytes=64 * 1024 * 1024, compact=False,
+                 tile_cache=None):
+        """Initialize the server state and load the static assets into memory."""
+        self.logger = logging.getLogger(__name__)
+        self.compact = compact
+        self.crosstab_files = [os.path.abspath(path) for path in crosstab_files]
+        self.input_dirs = input_dirs
+        self.cache = RenderCache(cache_bytes)
+        self.tile_cache = tile_cache
+        self.lock = threading.Lock()
+        self.cluster_data = {}
+        self.csv_index = {}
+        self.crosstab_fingerprint = None
+        self.directory_fingerprint = None
+
+        # Static assets are small and never change while serving
+        self.assets = {}
+        with open(os.path.join(CSS_DIR, 'ocp-stylesheet.css'), 'rb') as file:
+            self.assets['ocp-stylesheet.css'] = file.read()
+        for name in os.listdir(IMAGES_DIR):
+            if name.endswith('.png'):
+                with open(os.path.join(IMAGES_DIR, name), 'rb') as file:
+                    self.assets[name] = file.read()
+
+    def clusters(self):
+        """Returns the merged cluster list, re-reading the crosstabs if any has changed.
+
+        The node export directory index is rebuilt whenever a crosstab or any
+        input directory changes. A directory's mtime moves when a file is
+        added, removed or renamed in it, so exports that land after startup
+        (in any input directory) are found.
+        """
+        with self.lock:
+            fingerprint = [file_fingerprint(path) for path in self.crosstab_files]
+            if fingerprint != self.crosstab_fingerprint:
+                self.logger.info(f"Loading cluster lists: {self.crosstab_files}")
+                self.cluster_data = merge_cluster_data(
+                    read_cluster_csv_file(path) or {} for path in self.crosstab_files
+                )
+                self.crosstab_fingerprint = fingerprint
+                self.directory_fingerprint = None
+
+            directory_fingerprint = [file_fingerprint(directory) for directory in self.input_dirs]
+            if directory_fingerprint != self.directory_fingerprint:
+                self.logger.debug("Input directories changed, re-indexing node exports")
+                self.csv_index = build_directory_index(self.input_dirs)
+                self.directory_fingerprint = directory_fingerprint
+            return self.cluster_data
+
+    def _cluster_csv(self, cluster_id):
+        """Returns the node export path for a cluster."""
+        return resolve_cluster_csv(cluster_id, self.csv_index, self.input_dirs[0])
+
+    def _fingerprint(self, cluster_id, cluster_info):
+        """Fingerprints every input a cluster's outputs are rendered from."""
+        cluster_csv = self._cluster_csv(cluster_id)
+        row = repr(sorted(cluster_info.items())).encode()
+        return (hashlib.sha1(row).hexdigest(), file_fingerprint(cluster_csv))
+
+    def _load_cluster(self, cluster_id, cluster_info):
+        """Parses the node export for a cluster and splits it by role."""
+        cluster_csv = self._cluster_csv(cluster_id)
+        node_info = process_cluster_data(cluster_csv)
+        return {
+            'file_date': get_file_creation_date(cluster_csv),
+            'cluster_name': get_cluster_name(list(node_info.keys())),
+            'master': process_node_data(node_info, "Master"),
+            'infrastructure': process_node_data(node_info, "Infra"),
+            'worker': process_node_data(node_info, "Worker"),
+        }
+
+    def render(self, cluster_id, kind):
+        """Returns the rendered 'html' or 'png' for a cluster, or None if unknown."""
+        cluster_info = self.clusters().get(cluster_id)
+        if cluster_info is None:
+            return None
+
+        key = (cluster_id, kind)
+        fingerprint = self._fingerprint(cluster_id, cluster_info)
+        body = self.cache.get(key, fingerprint)
+        if body is not None:
+            self.logger.debug(f"Cache hit: {key}")
+            return body
+
+        self.logger.info(f"Rendering {kind} for cluster: {cluster_id}")
+        cluster = self._load_cluster(cluster_id, cluster_info)
+        worker_total_cpu = sum(int(float(data.get('CPU', 0))) for data in cluster['worker'].values())
+
+        if kind == 'html':
+            page, _ = build_html_report(
+                cluster_id, cluster['cluster_name'], cluster_info['Version'],
+                cluster['master'], cluster['infrastructure'], cluster['worker'],
+                cluster['file_date'], '/ocp-stylesheet.css', self.compact
+            )
+            body = page.replace('src="ocp-logo.png"', 'src="/ocp-logo.png"').encode('utf-8')
+        else:
+            node_counts = {
+                'master': len(cluster['master']),
+                'infrastructure': len(cluster['infrastructure']),
+                'worker': len(cluster['worker'])
+            }
+            body = render_reference_image(
+                node_counts, cluster['cluster_name'], cluster_info['Version'],
+                platform=cluster_info.get('Platform', 'Unknown'),
+                support=cluster_info.get('Support', 'Unknown'),
+                worker_total_cpu=worker_total_cpu,
+                variant=cluster_info.get('Variant', '?'),
+                cache=self.tile_cache
+            )
+
+        self.cache.put(key, fingerprint, body)
+        return body
+
+    def index(self):
+        """Returns an HTML index page listing every cluster by account."""
+        rows = []
+        for cluster_id, cluster_info in sorted(self.clusters().items(),
+                                               key=lambda item: (item[1]['Account'], item[0])):
+            quoted = html.escape(cluster_id)
+            rows.append(
+                f"<tr><td>{html.escape(cluster_info['Account'])}</td>"
+                f"<td>{quoted}</td><td>{html.escape(cluster_info['Version'])}</td>"
+                f'<td><a href="/cluster/{quoted}.html">report</a></td>'
+                f'<td><a href="/cluster/{quoted}.png">tile</a></td></tr>'
+            )
+        return (
+            '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+            '<title>Cluster Reports</title></head><body><table>'
+            '<tr><th>Account</th><th>Cluster ID</th><th>Version</th><th></th><th></th></tr>'
+            + ''.join(rows) + '</table></body></html>'
+        ).encode('utf-8')
+
+    def handle(self, path):
+        """Maps a request path to (status, content_type, body)."""
+        path = unquote(path.split('?', 1)[0])
+        if path in ('/', '/index.html'):
+            return 200, CONTENT_TYPES['.html'], self.index()
+
+        name = path.lstrip('/')
+        if name in self.assets:
+            return 200, CONTENT_TYPES[os.path.splitext(name)[1]], self.assets[name]
+
+        if name.startswith('cluster/'):
+            cluster_id, ext = os.path.splitext(name[len('cluster/'):])
+            if ext in ('.html', '.png'):
+                body = self.render(cluster_id, ext[1:])
+                if body is not None:
+                    return 200, CONTENT_TYPES[ext], body
+
+        return 404, 'text/plain; charset=utf-8', b'Not found'
+
+def serve_reports(crosstab_files, input_dirs, host='127.0.0.1', port=8000, cache_bytes=64 * 1024 * 1024,
+                  compact=False, tile_cache=None):
+    """Starts a local HTTP server that renders reports on demand."""
+    logger = logging.getLogger(__name__)
+    server = ReportServer(crosstab_files, input_dirs, cache_bytes, compact, tile_cache)
+
+    class RequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            try:
+                status, content_type, body = server.handle(self.path)
+            except Exception as e:
+                logger.error(f"Error serving {self.path}: {e}")
+                status, content_type, body = 500, 'text/plain; charset=utf-8', b'Internal error'
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    httpd = ThreadingHTTPServer((host, port), RequestHandler)
+    print(f"Serving cluster reports at http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server stopped.")
+    finally:
+        httpd.server_close()
+    return 0
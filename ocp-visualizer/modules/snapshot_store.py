@@ -0,0 +1,308 @@
+"""
+Module for the historical snapshot store.
+
+Every crosstab and node export that is ingested is recorded as a dated
+snapshot in a local SQLite database. Rows are only written when they differ
+from the latest stored row for the same key, so the store grows with the
+number of changes rather than the number of downloads.
+"""
+
+import os
+import sqlite3
+import hashlib
+from datetime import datetime
+
+from modules.data_processor import process_node_data
+from modules.sqlite_db import SQLiteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    cluster_id TEXT,
+    snapshot_date TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cluster_history (
+    cluster_id TEXT NOT NULL,
+    snapshot_date TEXT NOT NULL,
+    row_hash TEXT NOT NULL,
+    ebs_account TEXT,
+    account TEXT,
+    version TEXT,
+    desired_version TEXT,
+    eol INTEGER,
+    support TEXT,
+    platform TEXT,
+    update_risk TEXT,
+    last_seen TEXT,
+    PRIMARY KEY (cluster_id, snapshot_date)
+);
+CREATE INDEX IF NOT EXISTS idx_cluster_history_account
+    ON cluster_history (account, snapshot_date);
+CREATE INDEX IF NOT EXISTS idx_cluster_history_ebs_account
+    ON cluster_history (ebs_account, snapshot_date);
+
+CREATE TABLE IF NOT EXISTS node_history (
+    cluster_id TEXT NOT NULL,
+    host_name TEXT NOT NULL,
+    snapshot_date TEXT NOT NULL,
+    row_hash TEXT NOT NULL,
+    cpu INTEGER,
+    memory REAL,
+    roles TEXT,
+    removed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (cluster_id, host_name, snapshot_date)
+);
+
+CREATE TABLE IF NOT EXISTS node_totals (
+    cluster_id TEXT NOT NULL,
+    snapshot_date TEXT NOT NULL,
+    row_hash TEXT NOT NULL,
+    node_count INTEGER,
+    master_count INTEGER,
+    infra_count INTEGER,
+    worker_count INTEGER,
+    total_vcpu INTEGER,
+    worker_vcpu INTEGER,
+    total_memory REAL,
+    PRIMARY KEY (cluster_id, snapshot_date)
+);
+"""
+
+CLUSTER_COLUMNS = {
+    'ebs_account': 'EBS Account',
+    'account': 'Account',
+    'version': 'Version',
+    'desired_version': 'Desired Version',
+    'eol': 'EOL',
+    'support': 'Support',
+    'platform': 'Platform',
+    'update_risk': 'Update Risk',
+    'last_seen': 'Last Seen',
+}
+
+def _hash(*values):
+    """Returns a short stable hash of the given values."""
+    return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+def _file_hash(path):
+    """Returns the SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_snapshot_date(path):
+    """Returns a file's modification time as 'YYYY-MM-DD HH:MM:SS'.
+
+    mtime survives copies and checkouts far better than ctime, which is reset
+    whenever the file is copied or moved.
+    """
+    return datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M:%S')
+
+def run_snapshot_date(sources):
+    """Dates a run by the newest 'Last Seen' in its crosstabs, falling back to their newest mtime.
+
+    sources is {crosstab path: cluster data}. Every crosstab and node export of
+    the run is stored under this one date, so a cluster's version and node
+    counts land on the same trend row.
+    """
+    last_seen = max((cluster_info.get('Last Seen') or ''
+                     for cluster_data in sources.values() for cluster_info in cluster_data.values()), default='')
+    return last_seen or max(file_snapshot_date(path) for path in sources)
+
+class SnapshotStore(SQLiteDatabase):
+    """Append-only store of dated cluster and node snapshots."""
+
+    SCHEMA = SCHEMA
+
+    def _register_snapshot(self, kind, source, snapshot_date, cluster_id=None):
+        """Records a snapshot, returning False if this exact file was already ingested."""
+        content_hash = _file_hash(source)
+        try:
+            self.conn.execute(
+                "INSERT INTO snapshots (kind, source, content_hash, cluster_id, snapshot_date, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, os.path.abspath(source), content_hash, cluster_id, snapshot_date,
+                 datetime.now().isoformat(timespec='seconds'))
+            )
+        except sqlite3.IntegrityError:
+            self.logger.info(f"Already ingested, skipping: {source}")
+            return False
+        return True
+
+    def ingest_clusters(self, source, cluster_data, snapshot_date):
+        """Ingests a crosstab (as returned by read_cluster_csv_file) as a snapshot.
+
+        Returns the number of cluster rows that changed.
+        """
+        with self.conn:
+            if not self._register_snapshot('clusters', source, snapshot_date):
+                return 0
+
+            latest = dict(self.conn.execute(
+                "SELECT cluster_id, row_hash FROM cluster_history h "
+                "WHERE snapshot_date = (SELECT MAX(snapshot_date) FROM cluster_history "
+                "WHERE cluster_id = h.cluster_id)"
+            ))
+
+            rows = []
+            for cluster_id, cluster_info in cluster_data.items():
+                values = [cluster_info.get(key) for key in CLUSTER_COLUMNS.values()]
+                row_hash = _hash(*values)
+                if latest.get(cluster_id) == row_hash:
+                    continue
+                rows.append((cluster_id, snapshot_date, row_hash, *values))
+
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO cluster_history (cluster_id, snapshot_date, row_hash, "
+                f"{', '.join(CLUSTER_COLUMNS)}) VALUES ({', '.join('?' * (len(CLUSTER_COLUMNS) + 3))})",
+                rows
+            )
+        self.logger.info(f"Ingested {len(rows)} changed cluster rows from {source}")
+        return len(rows)
+
+    def ingest_nodes(self, source, cluster_id, node_info, snapshot_date):
+        """Ingests a node export (as returned by process_cluster_data) as a snapshot.
+
+        Returns the number of node rows that changed, including removals.
+        """
+        with self.conn:
+            if not self._register_snapshot('nodes', source, snapshot_date, cluster_id):
+                return 0
+
+            latest = {}
+            for host_name, row_hash, removed in self.conn.execute(
+                "SELECT host_name, row_hash, removed FROM node_history h "
+                "WHERE cluster_id = ? AND snapshot_date = (SELECT MAX(snapshot_date) FROM node_history "
+                "WHERE cluster_id = h.cluster_id AND host_name = h.host_name)",
+                (cluster_id,)
+            ):
+                if not removed:
+                    latest[host_name] = row_hash
+
+            rows = []
+            for host_name, data in node_info.items():
+                cpu = int(float(data.get('CPU', 0)))
+                memory = float(data.get('Memory', 0))
+                roles = data.get('Node Role', '')
+                row_hash = _hash(cpu, memory, roles)
+                if latest.pop(host_name, None) == row_hash:
+                    continue
+                rows.append((cluster_id, host_name, snapshot_date, row_hash, cpu, memory, roles, 0))
+
+            # Anything left in latest is no longer in the export
+            for host_name in latest:
+                rows.append((cluster_id, host_name, snapshot_date, 'removed', None, None, None, 1))
+
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO node_history (cluster_id, host_name, snapshot_date, row_hash, "
+                "cpu, memory, roles, removed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+            totals = self._node_totals(node_info)
+            row_hash = _hash(*totals)
+            previous = self.conn.execute(
+                "SELECT row_hash FROM node_totals WHERE cluster_id = ? "
+                "ORDER BY snapshot_date DESC LIMIT 1", (cluster_id,)
+            ).fetchone()
+            if previous is None or previous[0] != row_hash:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO node_totals (cluster_id, snapshot_date, row_hash, node_count, "
+                    "master_count, infra_count, worker_count, total_vcpu, worker_vcpu, total_memory) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (cluster_id, snapshot_date, row_hash, *totals)
+                )
+        self.logger.info(f"Ingested {len(rows)} changed node rows for cluster {cluster_id}")
+        return len(rows)
+
+    @staticmethod
+    def _node_totals(node_info):
+        """Returns (nodes, master, infra, worker, total_vcpu, worker_vcpu, total_memory) for a cluster.
+
+        A node with several roles (e.g. a compact cluster) counts once in nodes
+        but in every role count it matches.
+        """
+        master_nodes = process_node_data(node_info, "Master")
+        infrastructure_nodes = process_node_data(node_info, "Infra")
+        worker_nodes = process_node_data(node_info, "Worker")
+        total_vcpu = sum(int(float(data.get('CPU', 0))) for data in node_info.values())
+        worker_vcpu = sum(int(float(data.get('CPU', 0))) for data in worker_nodes.values())
+        total_memory = round(sum(float(data.get('Memory', 0)) for data in node_info.values()), 2)
+        return (len(node_info), len(master_nodes), len(infrastructure_nodes), len(worker_nodes),
+                total_vcpu, worker_vcpu, total_memory)
+
+    def cluster_trend(self, cluster_id):
+        """Returns the history of a cluster, one row per date on which anything changed.
+
+        Each row carries the version and node totals in effect on that date.
+        """
+        versions = self.conn.execute(
+            "SELECT snapshot_date, version, support FROM cluster_history "
+            "WHERE cluster_id = ? ORDER BY snapshot_date", (cluster_id,)
+        ).fetchall()
+        totals = self.conn.execute(
+            "SELECT snapshot_date, node_count, master_count, infra_count, worker_count, worker_vcpu, total_memory "
+            "FROM node_totals WHERE cluster_id = ? ORDER BY snapshot_date", (cluster_id,)
+        ).fetchall()
+
+        # Merge the two change logs, carrying the latest values forward
+        events = sorted([(row[0], 0, row[1:]) for row in versions] +
+                        [(row[0], 1, row[1:]) for row in totals])
+        current = {'version': None, 'support': None, 'nodes': None, 'master': None, 'infra': None,
+                   'worker': None, 'worker_vcpu': None, 'memory': None}
+        trend = []
+        for snapshot_date, kind, values in events:
+            if kind == 0:
+                current['version'], current['support'] = values
+            else:
+                (current['nodes'], current['master'], current['infra'], current['worker'],
+                 current['worker_vcpu'], current['memory']) = values
+            if trend and trend[-1]['date'] == snapshot_date:
+                trend[-1].update(current)
+            else:
+                trend.append({'date': snapshot_date, **current})
+        return trend
+
+    def account_trend(self, account):
+        """Returns fleet totals for an account (name or EBS number) on each change date."""
+        cluster_ids = [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT cluster_id FROM cluster_history WHERE account = ? OR ebs_account = ?",
+            (account, account)
+        )]
+        if not cluster_ids:
+            return []
+
+        placeholders = ', '.join('?' * len(cluster_ids))
+        rows = self.conn.execute(
+            f"SELECT snapshot_date, cluster_id, node_count, worker_vcpu "
+            f"FROM node_totals WHERE cluster_id IN ({placeholders}) ORDER BY snapshot_date",
+            cluster_ids
+        ).fetchall()
+
+        current = {}
+        nodes = vcpu = 0
+        trend = []
+        for snapshot_date, cluster_id, node_count, worker_vcpu in rows:
+            previous_nodes, previous_vcpu = current.get(cluster_id, (0, 0))
+            nodes += node_count - previous_nodes
+            vcpu += worker_vcpu - previous_vcpu
+            current[cluster_id] = (node_count, worker_vcpu)
+            entry = {'date': snapshot_date, 'clusters': len(current), 'nodes': nodes, 'worker_vcpu': vcpu}
+            if trend and trend[-1]['date'] == snapshot_date:
+                trend[-1] = entry
+            else:
+                trend.append(entry)
+        return trend
+
+    def query(self, sql, params=()):
+        """Runs a SQL query against the store, returning (column names, rows)."""
+        cursor = self.conn.execute(sql, params)
+        columns = [description[0] for description in cursor.description or []]
+        return columns, cursor.fetchall()
@@ -0,0 +1,33 @@
+"""
+Module for the local SQLite databases (snapshot store, node index).
+"""
+
+import os
+import sqlite3
+import logging
+
+class SQLiteDatabase:
+    """Opens a local SQLite database, creating it with its schema on first use.
+
+    Writable databases use WAL journaling so readers are never blocked by a
+    run that is ingesting. Read-only databases are opened with mode=ro and
+    are never created.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, db_path, read_only=False):
+        """Open (and if needed create) the database at db_path."""
+        self.logger = logging.getLogger(type(self).__module__)
+        self.db_path = db_path
+        if read_only:
+            self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self.conn = sqlite3.connect(db_path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        """Close the underlying database connection."""
+        self.conn.close()
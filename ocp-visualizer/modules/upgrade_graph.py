@@ -0,0 +1,174 @@
+"""
+Module for computing OpenShift upgrade paths from a local update graph.
+
+The graph is read from a file supplied by the user, either:
+    - CSV with 'from' and 'to' columns (and optionally 'channel'), or
+    - JSON in the update service (Cincinnati) format:
+      {"nodes": [{"version": "4.18.4"}, ...], "edges": [[0, 1], ...]}
+
+Versions are parsed and interned once, so every path search works on small
+integer ids. Shortest paths are found by breadth-first search from each
+distinct source version and memoized per (from, to) pair, so a fleet with
+hundreds of clusters on a few versions costs a few searches.
+"""
+
+import csv
+import json
+import logging
+from functools import lru_cache
+from collections import deque
+
+@lru_cache(maxsize=None)
+def parse_version(version):
+    """Parses '4.18.4' or '4.18.0-rc.1' into a sortable tuple.
+
+    Release versions sort after pre-releases of the same number.
+    """
+    version = (version or '').strip().lstrip('v')
+    release, _, prerelease = version.partition('-')
+    numbers = []
+    for part in release.split('.'):
+        numbers.append(int(part) if part.isdigit() else 0)
+    return tuple(numbers), (prerelease == '', prerelease)
+
+class UpgradeGraph:
+    """A directed graph of upgrade edges between interned versions."""
+
+    def __init__(self):
+        """Initialize an empty graph."""
+        self.logger = logging.getLogger(__name__)
+        self.ids = {}           # version string -> id
+        self.versions = []      # id -> version string
+        self.edges = []         # id -> set of ids
+        self.path_cache = {}    # (from id, to id) -> tuple of ids
+        self.searched = set()   # source ids whose paths are all in path_cache
+
+    def intern(self, version):
+        """Returns the id for a version, adding it to the graph if needed."""
+        version = version.strip()
+        version_id = self.ids.get(version)
+        if version_id is None:
+            version_id = len(self.versions)
+            self.ids[version] = version_id
+            self.versions.append(version)
+            self.edges.append(set())
+        return version_id
+
+    def add_edge(self, from_version, to_version):
+        """Adds an upgrade edge."""
+        self.edges[self.intern(from_version)].add(self.intern(to_version))
+        self.path_cache.clear()
+        self.searched.clear()
+
+    @classmethod
+    def from_file(cls, path, channel=None):
+        """Loads a graph from a CSV edge list or a Cincinnati JSON graph."""
+        graph = cls()
+        if path.endswith('.json'):
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+            versions = [node['version'] for node in data.get('nodes', [])]
+            for from_index, to_index in data.get('edges', []):
+                graph.add_edge(versions[from_index], versions[to_index])
+        else:
+            with open(path, newline='', encoding='utf-8-sig') as file:
+                for row in csv.DictReader(file):
+                    if channel and row.get('channel') and row['channel'] != channel:
+                        continue
+                    if row.get('from') and row.get('to'):
+                        graph.add_edge(row['from'], row['to'])
+        graph.logger.info(f"Loaded upgrade graph: {len(graph.versions)} versions, "
+                          f"{sum(len(targets) for targets in graph.edges)} edges")
+        return graph
+
+    def latest_version(self):
+        """Returns the highest version in the graph, or None if it is empty."""
+        if not self.versions:
+            return None
+        return max(self.versions, key=parse_version)
+
+    def _search(self, source_id):
+        """Breadth-first search from one version, caching the path to every reachable version."""
+        parents = {source_id: None}
+        queue = deque([source_id])
+        while queue:
+            current = queue.popleft()
+            # Visit newer targets first so ties prefer bigger hops
+            for target in sorted(self.edges[current], key=lambda i: parse_version(self.versions[i]),
+                                 reverse=True):
+                if target not in parents:
+                    parents[target] = current
+                    queue.append(target)
+
+        for target in parents:
+            path = []
+            node = target
+            while node is not None:
+                path.append(node)
+                node = parents[node]
+            self.path_cache[(source_id, target)] = tuple(reversed(path))
+        self.searched.add(source_id)
+
+    def shortest_path(self, from_version, to_version):
+        """Returns the shortest list of versions from from_version to to_version.
+
+        Returns None if either version is unknown or to_version is unreachable.
+        """
+        source_id = self.ids.get((from_version or '').strip())
+        target_id = self.ids.get((to_version or '').strip())
+        if source_id is None or target_id is None:
+            return None
+        if source_id not in self.searched:
+            self._search(source_id)
+        path = self.path_cache.get((source_id, target_id))
+        return [self.versions[i] for i in path] if path else None
+
+    def fleet_paths(self, requests):
+        """Resolves many (from, to) pairs in one batched pass.
+
+        Returns {(from, to): path or None}, searching once per distinct source.
+        """
+        results = {}
+        for from_version, to_version in sorted(set(requests), key=lambda pair: pair[0] or ''):
+            results[(from_version, to_version)] = self.shortest_path(from_version, to_version)
+        return results
+
+def plan_fleet_upgrades(cluster_data, graph, target_version=None):
+    """Computes an upgrade path for every cluster in a crosstab.
+
+    The target is target_version when given, else the cluster's 'Desired
+    Version', else the newest version in the graph. Returns a list of dicts
+    sorted by account and cluster id.
+    """
+    default_target = target_version or graph.latest_version()
+    targets = {}
+    for cluster_id, cluster_info in cluster_data.items():
+        desired = cluster_info.get('Desired Version')
+        if target_version or not desired or desired == cluster_info.get('Version'):
+            targets[cluster_id] = default_target
+        else:
+            targets[cluster_id] = desired
+
+    paths = graph.fleet_paths(
+        (cluster_info.get('Version'), targets[cluster_id])
+        for cluster_id, cluster_info in cluster_data.items()
+    )
+
+    plan = []
+    for cluster_id, cluster_info in cluster_data.items():
+        version = cluster_info.get('Version')
+        target = targets[cluster_id]
+        if version == target:
+            path = [version]
+        else:
+            path = paths[(version, target)]
+        plan.append({
+            'cluster_id': cluster_id,
+            'account': cluster_info.get('Account', ''),
+            'version': version,
+            'eol': cluster_info.get('EOL', False),
+            'update_risk': cluster_info.get('Update Risk', ''),
+            'target': target,
+            'path': path,
+        })
+    return sorted(plan, key=lambda entry: (entry['account'], entry['cluster_id']))
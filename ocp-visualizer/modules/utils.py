@@ -4,7 +4,6 @@ Module for utility functions.
 
 import os
 import logging
-from difflib import SequenceMatcher
 
 def to_upper_camel_case(s):
     """Converts a string to upper camel case."""
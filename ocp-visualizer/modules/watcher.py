@@ -0,0 +1,105 @@
+"""
+Module for watching the input directory for new SupportSense exports.
+"""
+
+import os
+import time
+import logging
+
+# Suffixes browsers use for downloads that are still in progress
+PARTIAL_DOWNLOAD_SUFFIXES = ('.crdownload', '.part', '.partial', '.download', '.tmp')
+
+class DirectoryWatcher:
+    """Polls one or more directories and reports CSV files once they have finished landing.
+
+    A file is only reported after its size and modification time have been
+    unchanged for `settle_polls` consecutive polls, which debounces partial
+    downloads and editors that write a file in several steps.
+    """
+
+    def __init__(self, directories, interval=0.25, settle_polls=2):
+        """Initialize the watcher and record the current state of the directories."""
+        self.logger = logging.getLogger(__name__)
+        if isinstance(directories, str):
+            directories = [directories]
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.interval = interval
+        self.settle_polls = settle_polls
+
+        # path -> (size, mtime_ns) of the last version that was reported
+        self.reported = self._scan()
+        # path -> [(size, mtime_ns), consecutive unchanged polls]
+        self.pending = {}
+
+    def _scan(self):
+        """Returns {path: (size, mtime_ns)} for every CSV file in the directories."""
+        state = {}
+        for directory in self.directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name.lower()
+                        if not entry.is_file() or name.endswith(PARTIAL_DOWNLOAD_SUFFIXES):
+                            continue
+                        if not name.endswith('.csv'):
+                            continue
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        state[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except Exception as e:
+                self.logger.error(f"Error scanning directory {directory}: {e}")
+        return state
+
+    def poll(self):
+        """Scans the directories once and returns the paths that are ready to process."""
+        ready = []
+        current = self._scan()
+
+        for path, signature in current.items():
+            if self.reported.get(path) == signature:
+                self.pending.pop(path, None)
+                continue
+
+            previous = self.pending.get(path)
+            if previous is None or previous[0] != signature:
+                # New or still growing, start (or restart) the settle count
+                self.pending[path] = [signature, 0]
+                continue
+
+            previous[1] += 1
+            if previous[1] >= self.settle_polls and signature[0] > 0:
+                del self.pending[path]
+                self.reported[path] = signature
+                ready.append(path)
+
+        # Forget files that have been removed
+        for path in list(self.reported):
+            if path not in current:
+                del self.reported[path]
+        for path in list(self.pending):
+            if path not in current:
+                del self.pending[path]
+
+        return ready
+
+    def watch(self, on_change):
+        """Polls forever, calling on_change(paths) whenever files are ready.
+
+        Errors raised by on_change are logged and polling carries on.
+        """
+        self.logger.info(f"Watching {', '.join(self.directories)} for new exports (Ctrl+C to stop)")
+        try:
+            while True:
+                ready = self.poll()
+                if ready:
+                    self.logger.debug(f"Files ready: {ready}")
+                    try:
+                        on_change(ready)
+                    except Exception as e:
+                        # Keep watching; the next export may well be fine
+                        self.logger.error(f"Error handling changed files {ready}: {e}")
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            self.logger.info("Stopped watching.")
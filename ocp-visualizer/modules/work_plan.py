@@ -0,0 +1,83 @@
+"""
+Module for planning a batch run before any cluster is rendered.
+
+Every node export the run needs is stat'ed and has its header sniffed up
+front, in parallel, so missing, empty or malformed files are reported before
+any work starts instead of one at a time halfway through the run. The
+clusters that are ready are ordered largest export first, so the slowest
+clusters start first and parallel runs finish together.
+"""
+
+import os
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.data_processor import resolve_cluster_csv
+
+# Columns process_cluster_data reads from a node export
+NODE_EXPORT_COLUMNS = ('Host Name', 'Cores', 'Memory (GB)', 'Roles')
+
+# Enough of a UTF-16 export to hold its header line
+HEADER_SNIFF_BYTES = 4096
+
+def sniff_header(path, encoding='utf-16'):
+    """Returns the header fields of a tab-separated export without reading the whole file."""
+    with open(path, 'rb') as file:
+        data = file.read(HEADER_SNIFF_BYTES)
+    # Keep whole UTF-16 code units so the decode cannot fail mid-character
+    text = data[:len(data) - len(data) % 2].decode(encoding, errors='replace')
+    line = text.replace('\r', '\n').split('\n', 1)[0]
+    return [field.strip('"') for field in line.split('\t')]
+
+def inspect_export(cluster_id, path):
+    """Stats and sniffs one node export.
+
+    Returns a plan entry: {'cluster_id', 'path', 'size', 'file_date', 'problem'},
+    where problem is None for a usable export.
+    """
+    entry = {'cluster_id': cluster_id, 'path': path, 'size': 0, 'file_date': None, 'problem': None}
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        entry['problem'] = f"Node export not found: {path}"
+        return entry
+    except OSError as e:
+        entry['problem'] = f"Cannot read node export {path}: {e}"
+        return entry
+
+    entry['size'] = stat.st_size
+    entry['file_date'] = datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d')
+    if stat.st_size == 0:
+        entry['problem'] = f"Node export is empty: {path}"
+        return entry
+
+    try:
+        header = sniff_header(path)
+    except Exception as e:
+        entry['problem'] = f"Cannot read node export {path}: {e}"
+        return entry
+    missing = [column for column in NODE_EXPORT_COLUMNS if column not in header]
+    if missing:
+        entry['problem'] = f"Node export {path} is missing columns: {', '.join(missing)}"
+    return entry
+
+def build_work_plan(cluster_ids, index, default_dir, max_workers=None):
+    """Checks the node export of every cluster in parallel.
+
+    Returns (plan, problems): the usable entries ordered largest export
+    first, and the entries that cannot be rendered, in cluster list order.
+    """
+    logger = logging.getLogger(__name__)
+    paths = [(cluster_id, resolve_cluster_csv(cluster_id, index, default_dir)) for cluster_id in cluster_ids]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        entries = list(pool.map(lambda item: inspect_export(*item), paths))
+
+    plan = sorted((entry for entry in entries if entry['problem'] is None),
+                  key=lambda entry: entry['size'], reverse=True)
+    problems = [entry for entry in entries if entry['problem'] is not None]
+    logger.info(f"Work plan: {len(plan)} clusters ready "
+                f"({sum(entry['size'] for entry in plan) / (1024 * 1024):.1f} MB of node exports), "
+                f"{len(problems)} with problems")
+    return plan, problems
@@ -6,22 +6,33 @@ Date: 2025-02-06
 Description: Brief description of what this script does.
 """
 
+import time
+STARTUP_TIME = time.perf_counter()
+
 import os
 import sys
 import logging
-import subprocess
 from modules.arg_parser import parse_args
 from modules.utils import setup_logging, to_upper_camel_case
-from modules.layout import generate_reference_image
+from modules.backends import get_backend
 from modules.data_processor import (
     read_cluster_csv_file,
+    expand_input_files,
+    merge_cluster_data,
+    build_directory_index,
+    resolve_cluster_csv,
     get_file_creation_date,
     process_cluster_data,
     process_node_data,
     get_cluster_name
 )
-from modules.html_generator import generate_html_report
-from modules.config import REFERENCE_DIR, FONTS_DIR, IMAGES_DIR, CSS_DIR
+from modules.config import (
+    FONTS_DIR, IMAGES_DIR, CSS_DIR, DEFAULT_STORE_PATH, STARTUP_BUDGET_MS, OUTPUT_BATCH_SIZE,
+    RENDER_CACHE_MAX_MB
+)
+
+# Heavier modules (Pillow, Airium, sqlite3, http.server) are imported only by
+# the modes that need them, and zipfile only when --bundle writes an archive.
 
 # Get script directory for relative paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -38,106 +49,504 @@ def ensure_reference_dirs():
     os.makedirs(IMAGES_DIR, exist_ok=True)
     os.makedirs(CSS_DIR, exist_ok=True)
 
+def load_cluster_lists(files):
+    """Reads every crosstab, returning ({path: clusters}, clusters merged by Cluster Id)."""
+    sources = {}
+    for path in files:
+        logging.info(f"Processing file: {path}")
+        clusters = read_cluster_csv_file(path)
+        if clusters:
+            sources[path] = clusters
+    return sources, merge_cluster_data(sources.values())
+
+def get_input_dirs(args, files):
+    """Returns the directories searched for node exports, crosstab folders first."""
+    input_dirs = []
+    for directory in [os.path.dirname(os.path.abspath(path)) for path in files] + (args.input_dir or []):
+        directory = os.path.abspath(directory)
+        if directory not in input_dirs:
+            input_dirs.append(directory)
+    return input_dirs
+
+def render_cluster(args, cluster_id, cluster_info, cluster_csv, node_info=None, writer=None,
+                   tile_cache=None, file_date=None):
+    """Renders the requested outputs for a single cluster.
+
+    Returns the list of files produced, or None if image generation failed.
+    Pass node_info to reuse node data that has already been parsed, and an
+    OutputWriter to stage the files instead of writing them straight away,
+    and a TileCache to reuse previously rendered reference tiles. Pass
+    file_date when the export has already been stat'ed.
+    """
+    artifacts = []
+    logging.debug(f"Processing cluster: {cluster_id}")
+    cluster_version = cluster_info['Version']
+    logging.info(f"Cluster Version: {cluster_version}")
+    account_name = to_upper_camel_case(cluster_info['Account'])
+
+    logging.info(f"Processing data for cluster: {cluster_id}")
+
+    if file_date is None:
+        logging.info(f"Determining date of data for cluster: {cluster_id}")
+        file_date = get_file_creation_date(cluster_csv)
+    logging.info(f"Date of data for cluster is: {file_date}")
+
+    if node_info is None:
+        node_info = process_cluster_data(cluster_csv)
+
+    master_nodes = process_node_data(node_info, "Master")
+    logging.debug(f"Master Nodes returned: {master_nodes}")
+    infrastructure_nodes = process_node_data(node_info, "Infra")
+    logging.debug(f"Infrastructure Nodes returned: {infrastructure_nodes}")
+    worker_nodes = process_node_data(node_info, "Worker")
+    logging.debug(f"Worker Nodes returned: {worker_nodes}")
+
+    cluster_name = get_cluster_name(list(node_info.keys()))
+    logging.info(f"Cluster Name: {cluster_name}")
+
+    # Generate HTML report only if --html flag is used
+    if args.html:
+        output_folder = os.path.join(home_directory, output_dir, account_name)
+        worker_total_cpu = get_backend('html')(
+            cluster_id, cluster_name, cluster_version,
+            master_nodes, infrastructure_nodes, worker_nodes,
+            file_date, output_folder, css_file, openshift_logo,
+            compact=args.compact_nodes, writer=writer
+        )
+        artifacts.append(os.path.join(output_folder, f"{cluster_name}.html"))
+    else:
+        worker_total_cpu = sum(int(float(data.get('CPU', 0))) for data in worker_nodes.values())
+
+    # Handle image generation if requested
+    if args.generate_images:
+        logging.info("Generating reference images...")
+        # Create image output filename using cluster name and date
+        output_folder = os.path.join(home_directory, output_dir, account_name)
+        image_output = os.path.join(output_folder, f"{cluster_name}_{file_date}.png")
+        if writer is None:
+            # Ensure output folder exists
+            os.makedirs(output_folder, exist_ok=True)
+        
+        # Prepare node counts for image generation
+        node_counts = {
+            'master': len(master_nodes),
+            'infrastructure': len(infrastructure_nodes),
+            'worker': len(worker_nodes)
+        }
+        
+        # Get platform and support info
+        platform = cluster_info.get('Platform', 'Unknown')
+        support = cluster_info.get('Support', 'Unknown')
+        variant = cluster_info.get('Variant', '?')  # Use the 'Variant' value from the cluster data
+        
+        #success = generate_reference_image(args.image_input, image_output, node_counts, cluster_name, cluster_version, 
+        success = get_backend('png')(image_output, node_counts, cluster_name, cluster_version, 
+                                        platform=platform, support=support, worker_total_cpu=worker_total_cpu,
+                                        variant=variant, writer=writer, cache=tile_cache)
+        if not success:
+            return None
+        artifacts.append(image_output)
+        logging.info(f"Cluster Name: {cluster_name}")
+        logging.info(f"Master Node Count: {len(master_nodes)}")
+        logging.info(f"Infrastructure Node Count: {len(infrastructure_nodes)}")
+        logging.info(f"Worker Node Count: {len(worker_nodes)}")
+        logging.info(f"Worker Node vCPU Count: {worker_total_cpu}")
+
+    return artifacts
+
+def make_tile_cache(args):
+    """Returns a tile cache, stored on disk when --render-cache is used."""
+    from modules.render_cache import TileCache
+    return TileCache(args.render_cache, max_bytes=RENDER_CACHE_MAX_MB * 1024 * 1024)
+
+def watch_input_directory(args, files, input_dirs, index, cluster_data, node_cache=None):
+    """Re-renders clusters as new exports land in the input directories.
+
+    Fonts, icons and parsed node data stay in memory between renders, so only
+    the clusters whose files changed are processed again. node_cache holds
+    the node data the batch run already parsed ({cluster_id: node_info});
+    clusters missing from it, such as those skipped by --resume, are parsed
+    the first time they change.
+    """
+    crosstab_paths = {os.path.abspath(path) for path in files}
+    node_cache = {} if node_cache is None else node_cache
+    from modules.output_writer import OutputWriter
+    writer = OutputWriter(bundle=args.bundle)
+    tile_cache = make_tile_cache(args)
+
+    def on_change(paths):
+        nonlocal cluster_data
+        changed = set()
+
+        if crosstab_paths.intersection(paths):
+            logging.info("Cluster list changed, re-reading crosstabs")
+            _, new_cluster_data = load_cluster_lists(files)
+            # Only clusters whose crosstab row changed need re-rendering
+            for cluster_id, cluster_info in new_cluster_data.items():
+                if cluster_data.get(cluster_id) != cluster_info:
+                    changed.add(cluster_id)
+            cluster_data = new_cluster_data
+
+        for path in paths:
+            if path in crosstab_paths:
+                continue
+            cluster_id = os.path.splitext(os.path.basename(path))[0]
+            if cluster_id not in cluster_data:
+                logging.debug(f"Ignoring file not in cluster list: {path}")
+                continue
+            index[os.path.basename(path)] = path
+            node_cache.pop(cluster_id, None)
+            changed.add(cluster_id)
+
+        # A bad export only skips its own cluster, as in a batch run
+        for cluster_id in sorted(changed):
+            logging.info(f"Re-rendering cluster: {cluster_id}")
+            cluster_csv = resolve_cluster_csv(cluster_id, index, input_dirs[0])
+            try:
+                if cluster_id not in node_cache:
+                    node_cache[cluster_id] = process_cluster_data(cluster_csv)
+                if render_cluster(args, cluster_id, cluster_data[cluster_id], cluster_csv,
+                                  node_info=node_cache[cluster_id], writer=writer,
+                                  tile_cache=tile_cache) is None:
+                    logging.error(f"Failed to render cluster: {cluster_id}")
+            except Exception as e:
+                logging.error(f"Error processing cluster {cluster_id}: {e}")
+                node_cache.pop(cluster_id, None)
+
+        try:
+            writer.flush()
+        except Exception as e:
+            logging.error(f"Error writing output files: {e}")
+
+    from modules.watcher import DirectoryWatcher
+    watcher = DirectoryWatcher(input_dirs, interval=args.watch_interval)
+    watcher.watch(on_change)
+
+def print_table(columns, rows):
+    """Prints rows as a tab-separated table with a header line."""
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if value is None else str(value) for value in row))
+
+def run_store_query(args):
+    """Answers --trend-cluster, --trend-account and --sql from the snapshot store."""
+    from modules.snapshot_store import SnapshotStore
+    db_path = args.store or DEFAULT_STORE_PATH
+    if not os.path.exists(db_path):
+        logging.error(f"Snapshot store not found: {db_path}")
+        return 1
+
+    store = SnapshotStore(db_path, read_only=True)
+    try:
+        if args.trend_cluster:
+            trend = store.cluster_trend(args.trend_cluster)
+            columns = ['date', 'version', 'support', 'nodes', 'master', 'infra', 'worker', 'worker_vcpu', 'memory']
+            print_table(columns, [[entry[column] for column in columns] for entry in trend])
+        if args.trend_account:
+            trend = store.account_trend(args.trend_account)
+            columns = ['date', 'clusters', 'nodes', 'worker_vcpu']
+            print_table(columns, [[entry[column] for column in columns] for entry in trend])
+        if args.sql:
+            print_table(*store.query(args.sql))
+    except Exception as e:
+        logging.error(f"Error querying snapshot store: {e}")
+        return 1
+    finally:
+        store.close()
+    return 0
+
+def run_node_query(args):
+    """Answers --find-host, --find-spec and --find-role from the node index."""
+    from modules.node_index import NodeIndex
+    if not os.path.exists(args.node_index):
+        logging.error(f"Node index not found: {args.node_index} (build it with --build-node-index)")
+        return 1
+
+    node_index = NodeIndex(args.node_index, read_only=True)
+    try:
+        if args.find_host:
+            print_table(*node_index.find_host(args.find_host))
+        if args.find_spec:
+            cpu, memory_gb = args.find_spec
+            print_table(*node_index.find_spec(int(cpu), memory_gb, args.find_role))
+        elif args.find_role:
+            print_table(*node_index.find_role(args.find_role))
+    except Exception as e:
+        logging.error(f"Error querying node index: {e}")
+        return 1
+    finally:
+        node_index.close()
+    return 0
+
+def run_node_index_build(args, cluster_data, index, input_dirs):
+    """Updates the node index with the export of every cluster in the cluster lists."""
+    from modules.node_index import NodeIndex
+    exports = {}
+    for cluster_id, cluster_info in cluster_data.items():
+        cluster_csv = resolve_cluster_csv(cluster_id, index, input_dirs[0])
+        exports[cluster_id] = (cluster_info.get('Account', ''), cluster_csv)
+
+    node_index = NodeIndex(args.node_index)
+    try:
+        counts = node_index.update(exports)
+    finally:
+        node_index.close()
+    print(f"{counts['indexed']} clusters indexed, {counts['unchanged']} unchanged, "
+          f"{counts['missing']} without a node export, {counts['failed']} unreadable, "
+          f"{counts['removed']} removed")
+    return 0
+
+def run_diff(args):
+    """Compares two node exports of a cluster and optionally writes an HTML delta report."""
+    from modules.node_diff import diff_nodes, format_diff
+    old_csv, new_csv = args.diff
+    for path in (old_csv, new_csv):
+        if not os.path.exists(path):
+            logging.error(f"File not found: {path}")
+            return 1
+
+    try:
+        old_info = process_cluster_data(old_csv)
+        new_info = process_cluster_data(new_csv)
+    except ValueError as e:
+        logging.error(str(e))
+        return 1
+    diff = diff_nodes(old_info, new_info)
+    for line in format_diff(diff):
+        print(line)
+
+    if args.html:
+        cluster_id = os.path.splitext(os.path.basename(new_csv))[0]
+        cluster_name = get_cluster_name(list(new_info.keys()) or list(old_info.keys()))
+
+        # File the report with the account's other reports when the crosstab is given
+        output_folder = os.path.join(home_directory, output_dir)
+        if args.files:
+            _, cluster_data = load_cluster_lists(expand_input_files(args.files))
+            if cluster_id in cluster_data:
+                account_name = to_upper_camel_case(cluster_data[cluster_id]['Account'])
+                output_folder = os.path.join(output_folder, account_name)
+
+        html_file = get_backend('html_diff')(
+            cluster_id, cluster_name, diff,
+            get_file_creation_date(old_csv), get_file_creation_date(new_csv),
+            output_folder, css_file, openshift_logo
+        )
+        logging.info(f"Delta report written to {html_file}")
+    return 0
+
+def run_ingest_benchmark(args):
+    """Prints decode-and-split throughput of both ingest paths for each file."""
+    from modules.tsv_reader import benchmark_ingest
+    print("file\tsize_mb\ttext_io_mb_s\tbulk_mb_s\tspeedup\trows_match")
+    for path in args.benchmark_ingest:
+        result = benchmark_ingest(path)
+        speedup = result['bulk_mb_s'] / result['text_io_mb_s']
+        print(f"{path}\t{result['size_mb']:.2f}\t{result['text_io_mb_s']:.1f}\t"
+              f"{result['bulk_mb_s']:.1f}\t{speedup:.2f}x\t{result['rows_match']}")
+    return 0
+
+def run_upgrade_paths(args, cluster_data):
+    """Prints an upgrade path for every cluster and optionally writes lifecycle reports."""
+    from modules.upgrade_graph import UpgradeGraph, plan_fleet_upgrades
+    try:
+        graph = UpgradeGraph.from_file(args.upgrade_edges, channel=args.upgrade_channel)
+    except Exception as e:
+        logging.error(f"Error reading update graph {args.upgrade_edges}: {e}")
+        return 1
+
+    plan = plan_fleet_upgrades(cluster_data, graph, args.upgrade_target)
+    print_table(
+        ['account', 'cluster_id', 'version', 'target', 'path'],
+        [[entry['account'], entry['cluster_id'], entry['version'], entry['target'],
+          ' -> '.join(entry['path']) if entry['path'] else 'no path']
+         for entry in plan]
+    )
+
+    if args.html:
+        from modules.output_writer import OutputWriter
+        writer = OutputWriter(bundle=args.bundle)
+        accounts = {}
+        for entry in plan:
+            accounts.setdefault(to_upper_camel_case(entry['account']), []).append(entry)
+        for account_name, entries in accounts.items():
+            output_folder = os.path.join(home_directory, output_dir, account_name)
+            html_file = get_backend('lifecycle_html')(account_name, entries, output_folder,
+                                                      css_file, openshift_logo, writer=writer)
+            logging.info(f"Lifecycle report staged as {html_file}")
+        for path in writer.flush():
+            logging.info(f"Wrote {path}")
+    return 0
+
 def main():
     """Main entry point for the script."""
     args = parse_args()
     setup_logging(args.verbosity)
     logger = logging.getLogger(__name__)
 
+    startup_ms = (time.perf_counter() - STARTUP_TIME) * 1000
+    # Cold starts (empty page cache, first run after install) can exceed the
+    # budget on their own, so this is only reported with -d
+    logger.debug(f"Startup took {startup_ms:.1f} ms (budget {STARTUP_BUDGET_MS} ms"
+                 f"{', exceeded' if startup_ms > STARTUP_BUDGET_MS else ''})")
+
     # Ensure reference directories exist
     ensure_reference_dirs()
 
+    # Answer history queries without processing any exports
+    if args.store_query:
+        return run_store_query(args)
+
+    # Answer node lookups without processing any exports
+    if args.node_query:
+        return run_node_query(args)
+
+    # Measure ingest throughput instead of rendering anything
+    if args.benchmark_ingest:
+        return run_ingest_benchmark(args)
+
+    # Compare two node exports instead of rendering the crosstab
+    if args.diff:
+        return run_diff(args)
+
     # Handle image generation if requested without file
-    if args.generate_images and not args.file:
+    if args.generate_images and not args.files:
         logger.info("Generating reference images...")
-        success = generate_reference_image(args.image_input, args.image_output)
+        success = get_backend('png')(args.image_input, args.image_output)
         if not success:
             return 1
         return 0
 
-    # Get the directory of the input file for relative paths
-    input_file_dir = os.path.dirname(os.path.abspath(args.file))
-    
-    # Read the cluster information file
-    cluster_data = read_cluster_csv_file(args.file)
-    if not cluster_data:
+    files = expand_input_files(args.files)
+    if not files:
         return 1
+    input_dirs = get_input_dirs(args, files)
+
+    # Render reports on demand instead of writing them all up front
+    if args.serve:
+        from modules.report_server import serve_reports
+        return serve_reports(files, input_dirs, port=args.port, cache_bytes=args.cache_size * 1024 * 1024,
+                             compact=args.compact_nodes, tile_cache=make_tile_cache(args))
 
     logging.info("Script started.")
-    logging.info(f"Processing file: {args.file}")
 
-    # Process each cluster
-    for cluster_id, cluster_info in cluster_data.items():
-        logging.debug(f"Processing cluster: {cluster_id}")
-        cluster_version = cluster_info['Version']
-        logging.info(f"Cluster Version: {cluster_version}")
-        account_name = to_upper_camel_case(cluster_info['Account'])
+    # Read every cluster list, keeping the newest row for clusters in several
+    sources, cluster_data = load_cluster_lists(files)
+    if not cluster_data:
+        return 1
+    logging.info(f"{len(cluster_data)} unique clusters in {len(sources)} cluster lists")
 
-        logging.info(f"Processing data for cluster: {cluster_id}")
+    # Upgrade paths only need the crosstabs
+    if args.upgrade_edges:
+        return run_upgrade_paths(args, cluster_data)
 
-        logging.info(f"Determining date of data for cluster: {cluster_id}")
-        # Use input file directory for finding related CSV files
-        cluster_csv = os.path.join(input_file_dir, f"{cluster_id}.csv")
-        file_date = get_file_creation_date(cluster_csv)
-        logging.info(f"Date of data for cluster is: {file_date}")
+    # Locate node exports across all input directories in one pass
+    index = build_directory_index(input_dirs)
 
-        node_info = process_cluster_data(cluster_csv)
+    if args.build_node_index:
+        return run_node_index_build(args, cluster_data, index, input_dirs)
 
-        master_nodes = process_node_data(node_info, "Master")
-        logging.debug(f"Master Nodes returned: {master_nodes}")
-        infrastructure_nodes = process_node_data(node_info, "Infra")
-        logging.debug(f"Infrastructure Nodes returned: {infrastructure_nodes}")
-        worker_nodes = process_node_data(node_info, "Worker")
-        logging.debug(f"Worker Nodes returned: {worker_nodes}")
+    store = None
+    if args.store:
+        from modules.snapshot_store import SnapshotStore, run_snapshot_date
+        store = SnapshotStore(args.store)
+        snapshot_date = args.snapshot_date or run_snapshot_date(sources)
+        logging.info(f"Recording snapshot dated {snapshot_date}")
+        for path, clusters in sources.items():
+            store.ingest_clusters(path, clusters, snapshot_date)
 
-        cluster_name = get_cluster_name(list(node_info.keys()))
-        logging.info(f"Cluster Name: {cluster_name}")
+    from modules.checkpoint import CheckpointJournal
+    from modules.output_writer import OutputWriter
 
-        # Generate HTML report only if --html flag is used
-        if args.html:
-            output_folder = os.path.join(home_directory, output_dir, account_name)
-            worker_total_cpu = generate_html_report(
-                cluster_id, cluster_name, cluster_version,
-                master_nodes, infrastructure_nodes, worker_nodes,
-                file_date, output_folder, css_file, openshift_logo
-            )
+    # Only the crosstabs that were read identify the run; unreadable ones were reported above
+    journal = CheckpointJournal(
+        list(sources), {'html': args.html, 'generate_images': args.generate_images,
+                'bundle': args.bundle, 'compact_nodes': args.compact_nodes},
+        resume=args.resume
+    )
+
+    # Outputs are written in batches; a cluster is only journalled as done
+    # once its files are on disk
+    writer = OutputWriter(bundle=args.bundle, batch_size=OUTPUT_BATCH_SIZE)
+    tile_cache = make_tile_cache(args)
+    staged = []
+
+    def flush_outputs():
+        try:
+            writer.flush()
+        except Exception as e:
+            logging.error(f"Error writing output files: {e}")
+            for cluster_id, _ in staged:
+                journal.mark_failed(cluster_id, f"Error writing output files: {e}")
         else:
-            worker_total_cpu = sum(int(float(data.get('CPU', 0))) for data in worker_nodes.values())
+            for cluster_id, artifacts in staged:
+                journal.mark_done(cluster_id, artifacts)
+        staged.clear()
+
+    # Check every node export up front and order the work largest first
+    from modules.work_plan import build_work_plan
+    pending = [cluster_id for cluster_id in cluster_data if not journal.is_done(cluster_id)]
+    if len(pending) < len(cluster_data):
+        logging.info(f"Already done, skipping {len(cluster_data) - len(pending)} clusters")
+    plan, problems = build_work_plan(pending, index, input_dirs[0])
+    for entry in problems:
+        logging.error(f"Cluster {entry['cluster_id']}: {entry['problem']}")
+        journal.mark_failed(entry['cluster_id'], entry['problem'])
+    if problems:
+        logging.warning(f"{len(problems)} of {len(pending)} clusters have missing or malformed node exports "
+                        f"and will be skipped")
+
+    # Node data parsed by this run, kept for watch mode
+    node_cache = {}
+
+    # Process each cluster, quarantining failures instead of stopping the run
+    for entry in plan:
+        cluster_id = entry['cluster_id']
+        cluster_info = cluster_data[cluster_id]
+        cluster_csv = entry['path']
+
+        try:
+            node_info = None
+            if store or args.watch:
+                # Parse once here so the snapshot, the render and watch mode share the data
+                node_info = process_cluster_data(cluster_csv)
+                if args.watch:
+                    node_cache[cluster_id] = node_info
+                if store and node_info:
+                    store.ingest_nodes(cluster_csv, cluster_id, node_info, snapshot_date)
+            artifacts = render_cluster(args, cluster_id, cluster_info, cluster_csv,
+                                       node_info=node_info, writer=writer, tile_cache=tile_cache,
+                                       file_date=entry['file_date'])
+        except Exception as e:
+            logging.error(f"Error processing cluster {cluster_id}: {e}")
+            journal.mark_failed(cluster_id, e)
+            continue
+
+        if artifacts is None:
+            journal.mark_failed(cluster_id, "Reference image generation failed")
+        else:
+            staged.append((cluster_id, artifacts))
+            if writer.should_flush(len(staged)):
+                flush_outputs()
+
+    flush_outputs()
+    logging.debug(f"Render cache: {tile_cache.stats}")
+
+    if store:
+        store.close()
+
+    failed = dict(journal.failed)
+    journal.close()
+    if failed:
+        print(f"{len(failed)} of {len(cluster_data)} clusters failed (re-run with --resume to retry them):")
+        for cluster_id, error in failed.items():
+            print(f"  {cluster_id}: {error}")
+
+    if args.watch:
+        watch_input_directory(args, files, input_dirs, index, cluster_data, node_cache)
 
-        # Handle image generation if requested
-        if args.generate_images:
-            logger.info("Generating reference images...")
-            # Create image output filename using cluster name and date
-            output_folder = os.path.join(home_directory, output_dir, account_name)
-            image_output = os.path.join(output_folder, f"{cluster_name}_{file_date}.png")
-            # Ensure output folder exists
-            os.makedirs(output_folder, exist_ok=True)
-            
-            # Prepare node counts for image generation
-            node_counts = {
-                'master': len(master_nodes),
-                'infrastructure': len(infrastructure_nodes),
-                'worker': len(worker_nodes)
-            }
-            
-            # Get platform and support info
-            platform = cluster_info.get('Platform', 'Unknown')
-            support = cluster_info.get('Support', 'Unknown')
-            variant = cluster_info.get('Variant', '?')  # Use the 'Variant' value from the cluster data
-            
-            #success = generate_reference_image(args.image_input, image_output, node_counts, cluster_name, cluster_version, 
-            success = generate_reference_image(image_output, node_counts, cluster_name, cluster_version, 
-                                            platform=platform, support=support, worker_total_cpu=worker_total_cpu,
-                                            variant=variant)
-            if not success:
-                return 1
-            logging.info(f"Cluster Name: {cluster_name}")
-            logging.info(f"Master Node Count: {len(master_nodes)}")
-            logging.info(f"Infrastructure Node Count: {len(infrastructure_nodes)}")
-            logging.info(f"Worker Node Count: {len(worker_nodes)}")
-            logging.info(f"Worker Node vCPU Count: {worker_total_cpu}")
-    
     logging.info("Script finished.")
+    return 1 if failed else 0
 
 if __name__ == '__main__':
     sys.exit(main())